@@ -34,33 +34,50 @@ class Qwen3Prompt:
             tool_matches = self.tool_pattern.findall(assistant_content)
 
             for func_idx, func_json_str in enumerate(tool_matches):
-                func_json_str = func_json_str.strip()
-                try:
-                    tool_call = json.loads(func_json_str)
-
-                    func_name = tool_call.get("name")
-                    func_args = tool_call.get("arguments", {})
-
-                    if isinstance(func_args, (dict, list)):
-                        func_args_str = json.dumps(func_args, ensure_ascii=False)
-                    else:
-                        func_args_str = str(func_args)
-
-                    message["tool_calls"].append(
-                        {
-                            "id": f"call_{func_idx + 1}",
-                            "type": "function",
-                            "function": {"name": func_name, "arguments": func_args_str},
-                        }
-                    )
-                except json.JSONDecodeError as e:
-                    logger.warning(
-                        f"Failed to parse tool JSON: {func_json_str[:50]}... Error: {e}"
-                    )
-                    continue
+                tool_call = self.parse_tool_call(func_idx, func_json_str)
+                if tool_call is not None:
+                    message["tool_calls"].append(tool_call)
 
             assistant_content = self.tool_pattern.sub("", assistant_content)
 
         message["content"] = assistant_content.removesuffix(self.eos_token).strip()
 
         return message
+
+    def parse_tool_call(self, func_idx: int, func_json_str: str) -> dict | None:
+        func_json_str = func_json_str.strip()
+        try:
+            tool_call = json.loads(func_json_str)
+
+            func_name = tool_call.get("name")
+            func_args = tool_call.get("arguments", {})
+
+            if isinstance(func_args, (dict, list)):
+                func_args_str = json.dumps(func_args, ensure_ascii=False)
+            else:
+                func_args_str = str(func_args)
+
+            return {
+                "id": f"call_{func_idx + 1}",
+                "type": "function",
+                "function": {"name": func_name, "arguments": func_args_str},
+            }
+        except json.JSONDecodeError as e:
+            logger.warning(
+                f"Failed to parse tool JSON: {func_json_str[:50]}... Error: {e}"
+            )
+            return None
+
+    def find_tool_calls(self, partial_content: str) -> list[str]:
+        """
+        Finds the complete tool call blocks of a response that is still being decoded.
+
+        Returns the raw JSON strings, numbered like in `parse_assistant_content`.
+        """
+        if self.think_start_token in partial_content:
+            # Tool calls are only made after thinking.
+            if self.think_end_token not in partial_content:
+                return []
+            partial_content = self.think_pattern.sub("", partial_content)
+
+        return self.tool_pattern.findall(partial_content)
@@ -1,3 +1,4 @@
+import math
 import re
 
 char_pattern = re.compile(r"[0-9a-zA-Z\u4e00-\u9fff]")
@@ -37,6 +38,12 @@ def is_cjk(text: str) -> bool:
     return bool(cjk_char_pattern.search(text))
 
 
+def estimate_num_tokens(text: str) -> int:
+    """Rough token count without a tokenizer, ~1.5 CJK or ~4 other chars per token."""
+    num_cjk_chars = len(cjk_char_pattern.findall(text))
+    return math.ceil(num_cjk_chars / 1.5 + (len(text) - num_cjk_chars) / 4)
+
+
 def truncate_text(text: str, max_len: int = 5000) -> str:
     if len(text) <= max_len:
         return text
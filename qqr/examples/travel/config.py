@@ -9,12 +9,46 @@ from qqr.utils.envs import (
 
 __all__ = [
     "group_reward_model_name",
+    "group_reward_model_kwargs",
+    "group_reward_dedup",
+    "group_reward_near_duplicate_threshold",
     "max_steps",
+    "prompt_layout",
+    "incremental_tokenization",
+    "session_affinity",
+    "trajectory_mode",
+    "speculative_tool_calls",
     "llm_judge_api_key",
     "llm_judge_base_url",
+    "llm_judge_base_urls",
     "llm_judge_model",
     "llm_judge_concurrency_limit",
+    "llm_judge_scheduler_policy",
+    "llm_judge_max_group_share",
+    "llm_judge_rpm_limit",
+    "llm_judge_tpm_limit",
+    "llm_judge_adaptive_concurrency",
+    "llm_judge_cache_maxsize",
+    "llm_judge_cache_path",
+    "llm_judge_compact_paths",
+    "llm_judge_max_path_tokens",
+    "llm_judge_tokenizer_path",
+    "llm_judge_mode",
+    "llm_judge_stream",
+    "llm_judge_bidirectional_margin",
+    "llm_judge_calibration_rate",
+    "llm_judge_hedge_quantile",
+    "llm_judge_max_hedges",
+    "llm_judge_fast_model",
+    "llm_judge_fast_api_key",
+    "llm_judge_fast_base_url",
+    "llm_judge_fast_concurrency_limit",
+    "llm_judge_fast_timeout",
+    "llm_judge_escalation_margin",
     "llm_judge_system_prompt",
+    "llm_judge_compact_system_prompt",
+    "llm_judge_winner_system_prompt",
+    "llm_judge_sequential_system_prompts",
     "mcp_server_config_fn",
 ]
 
@@ -89,19 +123,112 @@ def mcp_server_config_fn() -> list[MCPServer]:
 
 max_steps = 5
 
+# Select prompt layout of the agent loop:
+# - dynamic: rewrite the system message every turn with the current time and step count
+# - prefix_stable: pin the system message per group and append the step count as a
+#   trailing message, so that turns and samples share their prefix in the radix cache
+prompt_layout = "dynamic"
+
+# Keep the tokens of previous turns (including the sampled response tokens) and only
+# tokenize the new messages of each turn. Requires the prefix_stable prompt layout.
+# Set DEBUG=1 to verify the tokens against a full re-render of the messages.
+incremental_tokenization = False
+
+# Select routing of multi-turn requests:
+# - None: every request goes through the SGLang router
+# - trajectory: pin every trajectory to one engine and DP rank
+# - group: pin the whole group, so that the shared prompt also stays in one cache
+session_affinity = None
+
+# Select training samples of a trajectory:
+# - step: one sample per step with the context up to that step, padded to max_steps + 1
+# - sequence: one sample per trajectory, where only the assistant spans are trained.
+#   Requires the prefix_stable prompt layout.
+trajectory_mode = "step"
+
+# Dispatch each tool call as soon as it is decoded, while the rest of the response is
+# still being generated. Streams the responses from SGLang.
+speculative_tool_calls = False
+
 
 # Select topology:
-# - anchor
-# - swiss
+# - anchor: e.g. {"shared_first": True} to show the pivot first in the judge prompts, so
+#   that endpoints with prefix caching reuse it across the group
+# - swiss: e.g. {"adaptive": True} to stop once the standings are settled
 # - double_elimination
 # - single_elimination
 # - round_robin
+# - merge_sort
+# - bradley_terry: sparse comparison graph, e.g. {"degree": 4} comparisons per sample
+# - dueling_bandit: adaptive comparisons, e.g. {"batch_size": 8, "max_comparisons": 48}
 group_reward_model_name = "anchor"
+# Extra arguments of the topology.
+group_reward_model_kwargs = {}
+# Judge a single trajectory of each group of duplicates, sharing its reward. Near
+# duplicates too with a threshold on their estimated Jaccard similarity, e.g. 0.9.
+group_reward_dedup = False
+group_reward_near_duplicate_threshold = None
 
 llm_judge_api_key = DASHSCOPE_API_KEY
 llm_judge_base_url = DASHSCOPE_BASE_URL
+# Replicas of llm_judge_model to balance the judge requests over, with failover and
+# circuit breaking, e.g. ["http://10.0.0.1:30000/v1", "http://10.0.0.2:30000/v1"].
+# Only llm_judge_base_url if None.
+llm_judge_base_urls = None
 llm_judge_model = "qwen-plus"
 llm_judge_concurrency_limit = 10
+# Select the order of the judge requests waiting for a slot:
+# - fifo: arrival order
+# - group: requests of the earliest started group first, so that groups finish early
+llm_judge_scheduler_policy = "group"
+# Share of the judge slots a group may hold while other groups are waiting.
+llm_judge_max_group_share = 0.5
+# Request and token budgets per minute of the judge provider, e.g. 1200 and 1000000.
+# The tokens of a request are estimated from its prompt. Unlimited if None.
+llm_judge_rpm_limit = None
+llm_judge_tpm_limit = None
+# Halve the judge concurrency on rate limits and grow it back one slot at a time, up to
+# llm_judge_concurrency_limit.
+llm_judge_adaptive_concurrency = False
+# Verdicts of identical comparisons are reused, since the judge runs at temperature 0.
+# Set llm_judge_cache_path to a SQLite file to keep them across restarts and reruns,
+# or llm_judge_cache_maxsize to 0 to disable the cache.
+llm_judge_cache_maxsize = 65536
+llm_judge_cache_path = None
+# Show the judge compact JSON lines of the steps instead of their Python repr, each
+# trajectory serialized once per group. With llm_judge_max_path_tokens, e.g. 6000, the
+# longest reasoning blocks are cut (head and tail kept) to fit the budget of a path,
+# counted with the tokenizer at llm_judge_tokenizer_path, or estimated if None.
+llm_judge_compact_paths = False
+llm_judge_max_path_tokens = None
+llm_judge_tokenizer_path = None
+# Select judge output:
+# - verbose: analyses and per-dimension scores before the combined scores, for audits
+# - compact: only the combined scores
+# - winner: only the winner, scored from its log probs when the endpoint returns them
+llm_judge_mode = "verbose"
+# Stream the judge responses and stop reading once the combined scores are parsed.
+llm_judge_stream = False
+# Only compare in the swapped order when the first verdict is closer than this margin,
+# e.g. 4.0 for the 0-10 scores. Always compares both ways if None.
+llm_judge_bidirectional_margin = None
+# Fraction of the skipped swapped comparisons still run, to measure the agreement.
+llm_judge_calibration_rate = 0.05
+# Send a judge request again once it runs longer than this quantile of the recent
+# latencies, e.g. 0.9, and keep the first response. Never hedged if None.
+llm_judge_hedge_quantile = None
+# Max hedged judge requests in flight.
+llm_judge_max_hedges = 4
+# Cascade: a fast judge, e.g. a small model behind a local OpenAI-compatible endpoint,
+# settles the clear comparisons, and its close calls or failures are escalated to
+# llm_judge_model. Disabled if llm_judge_fast_model is None.
+llm_judge_fast_model = None
+llm_judge_fast_api_key = "EMPTY"
+llm_judge_fast_base_url = "http://127.0.0.1:30001/v1"
+llm_judge_fast_concurrency_limit = 64
+llm_judge_fast_timeout = 10
+# Score margin of a fast verdict under which it is escalated.
+llm_judge_escalation_margin = 2.0
 llm_judge_system_prompt = """你是一名深谙旅游行业、具有严谨逻辑与评测方法论的「旅行规划 LLM 代理综合评审员」。现需对同一用户 Query 下，LLM Agent A 与 Agent B 的推理路径（Path）和回答结果（Answer）分别进行分维度量化评估，并最终给出综合得分与胜者。请严格遵循下列指标、打分规则与输出格式。
 
 一、评估内容格式
@@ -219,3 +346,50 @@ llm_judge_system_prompt = """你是一名深谙旅游行业、具有严谨逻辑
 - around_search工具通过设置圆心和半径，搜索圆形区域内的地点信息。
 - web_search工具用于执行通用的、开放知识搜索。
 - direction工具除了起始点、终点经纬度，还可以设置waypoints途经点。因此针对多点路线导航，既可以通过多次调用不带waypoints的direction工具来完成规划，也可以通过调用单次带waypoints的direction工具来完成规划。因此评估应关注整条路线每个点是否都被覆盖到，在都覆盖了的前提下，再看路线信息的完整性，路线的合理性"""
+
+# The compact modes keep the criteria of the verbose prompt, but only ask for the verdict.
+llm_judge_compact_system_prompt = (
+    llm_judge_system_prompt.split("【输出格式")[0]
+    + """【输出格式（严格遵循，不要添加多余内容）】
+{"combined_scores": {"Agent_A": <0-10>, "Agent_B": <0-10>}}
+【重要要求】
+• 先逐维度独立思考后再给分，确保公平客观，但不要输出评述与分维度得分。
+• 只输出上述 JSON，以便后续程序解析。"""
+    + "\n\n【工具解释】"
+    + llm_judge_system_prompt.split("【工具解释】")[1]
+)
+llm_judge_winner_system_prompt = (
+    llm_judge_system_prompt.split("【输出格式")[0]
+    + """【输出格式（严格遵循，不要添加多余内容）】
+只输出胜者：A、B 或 Tie。
+【重要要求】
+• 先逐维度独立思考后再判定，确保公平客观，但不要输出评述与得分。"""
+    + "\n\n【工具解释】"
+    + llm_judge_system_prompt.split("【工具解释】")[1]
+)
+
+# The sequential layout of the anchor comparisons sharing their pivot shows the path and
+# answer of Agent A, then those of Agent B.
+llm_judge_sequential_system_prompts = {
+    mode: system_prompt.replace(
+        """<PATH_B>
+{LLM Agent B 的完整推理路径}
+</PATH_B>
+
+<ANSWER_A>
+{LLM Agent A 的完整回答}
+</ANSWER_A>""",
+        """<ANSWER_A>
+{LLM Agent A 的完整回答}
+</ANSWER_A>
+
+<PATH_B>
+{LLM Agent B 的完整推理路径}
+</PATH_B>""",
+    )
+    for mode, system_prompt in (
+        ("verbose", llm_judge_system_prompt),
+        ("compact", llm_judge_compact_system_prompt),
+        ("winner", llm_judge_winner_system_prompt),
+    )
+}
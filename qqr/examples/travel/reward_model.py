@@ -1,145 +1,110 @@
-import asyncio
 import logging
-import re
 from argparse import Namespace
 
-from openai import AsyncOpenAI
-
+from slime.utils.processing_utils import load_tokenizer
+
+from qqr.llm_judges import (
+    CascadeLLMJudge,
+    JudgeEndpointPool,
+    JudgeScheduler,
+    PairwiseLLMJudge,
+    TrajectorySerializer,
+    VerdictCache,
+    judge_group_scope,
+)
 from qqr.reward_models import get_reward_model
-from qqr.schemas import LLMJudge, Sample
+from qqr.schemas import GroupRewardSession, Sample
 
 from . import config
 
 logger = logging.getLogger(__name__)
 
 
-class TravelLLMJudge(LLMJudge):
+class TravelLLMJudge(PairwiseLLMJudge):
     def __init__(self):
-        self.system_prompt = config.llm_judge_system_prompt
-        self.model = config.llm_judge_model
-        self._client = None
-
-        self.concurrency_limit = config.llm_judge_concurrency_limit
-        self._semaphore: asyncio.Semaphore | None = None
-
-        self.score_a_pattern = re.compile(
-            r'"combined_scores"\s*:\s*\{[^{}]*?"Agent_A"\s*:\s*([0-9]+(?:\.[0-9]+)?)',
-            re.S | re.I,
-        )
-        self.score_b_pattern = re.compile(
-            r'"combined_scores"\s*:\s*\{[^{}]*?"Agent_B"\s*:\s*([0-9]+(?:\.[0-9]+)?)',
-            re.S | re.I,
-        )
-        self.winner_pattern = re.compile(
-            r'"winner"\s*:\s*"(?P<winner>Agent_A|Agent_B|Tie)"', re.I
-        )
-
-    @property
-    def client(self) -> AsyncOpenAI:
-        if self._client is None:
-            self._client = AsyncOpenAI(
-                api_key=config.llm_judge_api_key,
-                base_url=config.llm_judge_base_url,
-                timeout=60,
-                max_retries=10,
+        system_prompts = {
+            "verbose": config.llm_judge_system_prompt,
+            "compact": config.llm_judge_compact_system_prompt,
+            "winner": config.llm_judge_winner_system_prompt,
+        }
+        super().__init__(
+            system_prompt=system_prompts[config.llm_judge_mode],
+            sequential_system_prompt=config.llm_judge_sequential_system_prompts[
+                config.llm_judge_mode
+            ],
+            model=config.llm_judge_model,
+            api_key=config.llm_judge_api_key,
+            base_url=config.llm_judge_base_url,
+            concurrency_limit=config.llm_judge_concurrency_limit,
+            scheduler=JudgeScheduler(
+                config.llm_judge_concurrency_limit,
+                policy=config.llm_judge_scheduler_policy,
+                max_group_share=config.llm_judge_max_group_share,
+                rpm_limit=config.llm_judge_rpm_limit,
+                tpm_limit=config.llm_judge_tpm_limit,
+                adaptive_concurrency=config.llm_judge_adaptive_concurrency,
+            ),
+            endpoints=JudgeEndpointPool(
+                config.llm_judge_base_urls, api_key=config.llm_judge_api_key
+            )
+            if config.llm_judge_base_urls
+            else None,
+            cache=VerdictCache(
+                maxsize=config.llm_judge_cache_maxsize,
+                path=config.llm_judge_cache_path,
             )
-        return self._client
-
-    @property
-    def semaphore(self) -> asyncio.Semaphore:
-        """
-        Lazy-initialized semaphore that binds to the current running Event Loop.
-
-        Using lazy initialization prevents "Future attached to a different loop" errors
-        when the server instance persists across multiple asyncio.run() calls or
-        event loop restarts.
-        """
-        if self._semaphore is None:
-            self._semaphore = asyncio.Semaphore(self.concurrency_limit)
-        return self._semaphore
-
-    async def compare(
-        self, messages_a: list[dict], messages_b: list[dict], query: str
-    ) -> tuple[float, float]:
-        trajectory_a, answer_a = self.process_messages(messages_a)
-        trajectory_b, answer_b = self.process_messages(messages_b)
-
-        prompt = f"""<USER_QUERY>\n{query}\n</USER_QUERY>\n\n<PATH_A>\n{trajectory_a}\n</PATH_A>\n\n<PATH_B>\n{trajectory_b}\n</PATH_B>\n\n<Answer_A>\n{answer_a}\n</Answer_A>\n\n<Answer_B>\n{answer_b}\n</Answer_B>"""
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": prompt},
-        ]
-
-        score_a, score_b = 5.0, 5.0
-        try:
-            async with self.semaphore:
-                response = await self.client.chat.completions.create(
-                    messages=messages, model=self.model, temperature=0.0
+            if config.llm_judge_cache_maxsize > 0
+            else None,
+            serializer=TrajectorySerializer(
+                max_path_tokens=config.llm_judge_max_path_tokens,
+                tokenizer=load_tokenizer(
+                    config.llm_judge_tokenizer_path, trust_remote_code=True
                 )
-
-            score_a, score_b = self.get_judge_scores(
-                response.choices[0].message.content
+                if config.llm_judge_tokenizer_path
+                else None,
             )
-
-        except Exception as e:
-            logger.warning(f"[LLMJudge] Failed to get result: {e}")
-
-        return score_a, score_b
-
-    async def bidirectional_compare(
-        self, messages_a: list[dict], messages_b: list[dict], query: str, **kwargs
-    ) -> tuple[float, float, dict]:
-        results = await asyncio.gather(
-            self.compare(messages_a, messages_b, query=query),
-            self.compare(messages_b, messages_a, query=query),
+            if config.llm_judge_compact_paths
+            else None,
+            mode=config.llm_judge_mode,
+            stream=config.llm_judge_stream,
+            bidirectional_margin=config.llm_judge_bidirectional_margin,
+            calibration_rate=config.llm_judge_calibration_rate,
+            hedge_quantile=config.llm_judge_hedge_quantile,
+            max_hedges=config.llm_judge_max_hedges,
         )
 
-        score_a = results[0][0] + results[1][1]
-        score_b = results[0][1] + results[1][0]
-
-        return score_a, score_b, kwargs
-
-    def process_messages(self, messages: list[dict]) -> tuple[list[dict], str]:
-        step_idx = 0
-        trajectory = []
-        for message in messages[:-1]:
-            if message["role"] != "assistant":
-                continue
-
-            step_idx += 1
-            trajectory.append(
-                {
-                    "step": step_idx,
-                    "reasoning_content": message.get("reasoning_content", ""),
-                    "tool_calls": message.get("tool_calls", ""),
-                }
-            )
-
-        answer = "未回复"
-        if messages[-1]["role"] == "assistant":
-            answer = messages[-1].get("content") or answer
-
-        return trajectory, answer
-
-    def get_judge_scores(self, response: str) -> tuple[float, float]:
-        score_a, score_b = 5.0, 5.0
-
-        try:
-            match_a = self.score_a_pattern.search(response)
-            match_b = self.score_b_pattern.search(response)
-
-            if match_a and match_b:
-                score_a = float(match_a.group(1))
-                score_b = float(match_b.group(1))
-
-        except:
-            pass
-
-        return score_a, score_b
-
 
 llm_judge = TravelLLMJudge()
-group_reward_model = get_reward_model(config.group_reward_model_name)(llm_judge)
+if config.llm_judge_fast_model is not None:
+    llm_judge = CascadeLLMJudge(
+        fast_judge=PairwiseLLMJudge(
+            system_prompt=llm_judge.system_prompt,
+            model=config.llm_judge_fast_model,
+            api_key=config.llm_judge_fast_api_key,
+            base_url=config.llm_judge_fast_base_url,
+            concurrency_limit=config.llm_judge_fast_concurrency_limit,
+            timeout=config.llm_judge_fast_timeout,
+            max_retries=0,
+            cache=llm_judge.cache,
+            serializer=llm_judge.serializer,
+            mode=config.llm_judge_mode,
+            sequential_system_prompt=llm_judge.sequential_system_prompt,
+            stream=config.llm_judge_stream,
+        ),
+        strong_judge=llm_judge,
+        escalation_margin=config.llm_judge_escalation_margin,
+    )
+if config.group_reward_dedup:
+    group_reward_model = get_reward_model("dedup")(
+        llm_judge,
+        reward_model=config.group_reward_model_name,
+        reward_model_kwargs=config.group_reward_model_kwargs,
+        near_duplicate_threshold=config.group_reward_near_duplicate_threshold,
+    )
+else:
+    group_reward_model = get_reward_model(config.group_reward_model_name)(
+        llm_judge, **config.group_reward_model_kwargs
+    )
 
 
 async def eval_reward(args: Namespace, sample: Sample, **kwargs):
@@ -162,23 +127,65 @@ async def eval_reward(args: Namespace, sample: Sample, **kwargs):
         sample.reward = 0.5
 
 
+def get_group_query(group: list[Sample] | list[list[Sample]]) -> str:
+    sample = group[0][0] if isinstance(group[0], list) else group[0]
+    if isinstance(sample.prompt, str):
+        return sample.prompt
+    return sample.prompt[-1]["content"]
+
+
 async def group_reward(args: Namespace, group: list[list[Sample]], **kwargs):
     if len(group) <= 1:
         raise ValueError("group size must be greater than 1")
 
     predictions = [g[-1].messages for g in group]
-    if isinstance(group[0][0].prompt, str):
-        query = group[0][0].prompt
-    else:
-        query = group[0][0].prompt[-1]["content"]
+    query = get_group_query(group)
 
-    group_rewards = await group_reward_model(predictions=predictions, query=query)
+    with judge_group_scope():
+        group_rewards = await group_reward_model(predictions=predictions, query=query)
 
     for idx in range(len(group)):
         for sample in group[idx]:
             sample.reward = group_rewards[idx]
 
 
+class TrajectoryGroupRewardSession:
+    """Feeds the trajectories of a group to the group reward model as they finish."""
+
+    def __init__(self, session: GroupRewardSession):
+        self.session = session
+        self.trajectories: list[list[Sample] | None] = [None] * session.group_size
+
+    def submit(self, idx: int, samples: list[Sample]) -> None:
+        self.trajectories[idx] = samples
+        self.session.submit(idx, samples[-1].messages)
+
+    async def finalize(self) -> None:
+        group_rewards = await self.session.finalize()
+
+        for idx, samples in enumerate(self.trajectories):
+            for sample in samples:
+                sample.reward = group_rewards[idx]
+
+    def cancel(self) -> None:
+        self.session.cancel()
+
+
+def open_group_reward_session(
+    args: Namespace, group: list[Sample]
+) -> TrajectoryGroupRewardSession:
+    """Incremental counterpart of `group_reward`, opened when the group is submitted."""
+    if len(group) <= 1:
+        raise ValueError("group size must be greater than 1")
+
+    # The judge requests of the session are scheduled as a group.
+    with judge_group_scope():
+        session = group_reward_model.open_session(
+            len(group), query=get_group_query(group)
+        )
+    return TrajectoryGroupRewardSession(session)
+
+
 def reward_post_process(args: Namespace, samples: list[Sample] | list[list[Sample]]):
     raw_rewards = [sample.get_reward_value(args) for sample in samples]
     return raw_rewards, raw_rewards
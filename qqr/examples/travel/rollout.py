@@ -5,16 +5,26 @@ from copy import deepcopy
 from datetime import datetime
 from typing import Any
 
+from cachetools import LRUCache
+
 from qqr.data.prompts.qwen3 import Qwen3Prompt
 from qqr.rollout.agent_rollout import GenerateState, MCPState
 from qqr.rollout.agent_rollout import generate as base_generate
-from qqr.schemas import Sample
+from qqr.rollout.speculative_tools import SpeculativeToolExecutor
+from qqr.rollout.token_buffer import TrajectoryTokenBuffer
+from qqr.schemas import MessageLog, Sample
+from qqr.utils.envs import DEBUG
 
 from . import config
 from .reward_model import eval_reward
 
 logger = logging.getLogger(__name__)
 
+# Pinned timestamps of the groups in flight, so that every sample of a group shares
+# the same system prompt under the prefix-stable layout. Keyed by (evaluation,
+# group_index), since the train and eval rollouts number their groups independently.
+group_timestamps = LRUCache(maxsize=4096)
+
 
 async def generate(
     args: Namespace,
@@ -29,7 +39,7 @@ async def generate(
     else:
         sample.messages = deepcopy(sample.prompt)
 
-    samples = await agent_loop(args, sample, sampling_params)
+    samples = await agent_loop(args, sample, sampling_params, evaluation=evaluation)
 
     if evaluation:
         sample = samples[-1]
@@ -39,14 +49,46 @@ async def generate(
         return samples
 
 
+def get_timestamp(sample: Sample, evaluation: bool = False) -> str:
+    timestamp = datetime.now().strftime("%d/%m/%Y, %H:%M")
+    if sample.group_index is None:
+        return timestamp
+
+    return group_timestamps.setdefault((evaluation, sample.group_index), timestamp)
+
+
+def get_session_id(sample: Sample) -> tuple | None:
+    if config.session_affinity == "trajectory":
+        return (sample.group_index, sample.index)
+    elif config.session_affinity == "group" and sample.group_index is not None:
+        return (sample.group_index,)
+    return None
+
+
 def build_system_message(step_idx: int, max_steps: int) -> dict:
     system_prompt = f"""当前时间: {datetime.now().strftime("%d/%m/%Y, %H:%M")}"""
-    system_prompt += f"""\n\n可调用{max_steps}轮工具，已调用{step_idx}轮。"""
+    system_prompt += f"""\n\n{build_step_prompt(step_idx, max_steps)}"""
+
+    return {"role": "system", "content": system_prompt}
+
+
+def build_static_system_message(timestamp: str) -> dict:
+    """System message of the prefix-stable layout, shared by the whole group."""
+    return {"role": "system", "content": f"""当前时间: {timestamp}"""}
+
+
+def build_step_message(step_idx: int, max_steps: int) -> dict:
+    """Trailing message of the prefix-stable layout, appended before every turn."""
+    return {"role": "system", "content": build_step_prompt(step_idx, max_steps)}
+
+
+def build_step_prompt(step_idx: int, max_steps: int) -> str:
+    step_prompt = f"""可调用{max_steps}轮工具，已调用{step_idx}轮。"""
 
     if step_idx >= max_steps:
-        system_prompt += """\n\n请直接回答，不要使用工具。"""
+        step_prompt += """\n\n请直接回答，不要使用工具。"""
 
-    return {"role": "system", "content": system_prompt}
+    return step_prompt
 
 
 async def agent_loop(
@@ -54,13 +96,37 @@ async def agent_loop(
     sample: Sample,
     sampling_params: dict[str, Any],
     max_steps: int = config.max_steps,
+    evaluation: bool = False,
 ) -> list[Sample]:
     state = GenerateState(args)
     mcp_state = MCPState(config.mcp_server_config_fn)
     prompter = Qwen3Prompt()
+    prefix_stable = config.prompt_layout == "prefix_stable"
+    single_sequence = config.trajectory_mode == "sequence"
+
+    token_buffer = None
+    if config.incremental_tokenization or single_sequence:
+        if not prefix_stable:
+            raise ValueError(
+                "Incremental tokenization and the sequence trajectory mode require "
+                "the prefix_stable prompt layout."
+            )
+        token_buffer = TrajectoryTokenBuffer(
+            state.tokenizer, tools=mcp_state.tools, verify=DEBUG
+        )
 
     if sample.messages[0]["role"] != "system":
-        sample.messages.insert(0, build_system_message(0, max_steps))
+        if prefix_stable:
+            sample.messages.insert(
+                0, build_static_system_message(get_timestamp(sample, evaluation))
+            )
+        else:
+            sample.messages.insert(0, build_system_message(0, max_steps))
+
+    # The steps share one message log instead of copying the messages.
+    sample.messages = MessageLog(sample.messages).view()
+    # Parsed assistant messages by position, to avoid parsing them again at the end.
+    parsed_messages: dict[int, dict] = {}
     samples = []
 
     for step_idx in range(max_steps):
@@ -68,7 +134,7 @@ async def agent_loop(
             Sample(
                 group_index=sample.group_index,
                 index=sample.index,
-                messages=deepcopy(sample.messages),
+                messages=sample.messages.view(),
                 prompt=sample.prompt,
                 label=sample.label,
                 status=Sample.Status.PENDING,
@@ -77,23 +143,54 @@ async def agent_loop(
             )
         )
         sample = samples[-1]
-        sample.messages[0] = build_system_message(step_idx, max_steps)
-        sample = await base_generate(args, sample, sampling_params)
-
-        sample.messages.append(
-            {
-                "role": "assistant",
-                "content": sample.response.removesuffix(state.tokenizer.eos_token),
-            }
+        if prefix_stable:
+            sample.messages.append(build_step_message(step_idx, max_steps))
+        else:
+            sample.messages[0] = build_system_message(step_idx, max_steps)
+        prompt_ids = (
+            token_buffer.get_prompt_ids(sample.messages) if token_buffer else None
         )
-        sample.response_message = prompter.parse_assistant_content(sample.response)
-        tool_calls = sample.response_message.get("tool_calls") or []
+        executor = (
+            SpeculativeToolExecutor(mcp_state.call_tool, prompter)
+            if config.speculative_tool_calls
+            else None
+        )
+        try:
+            sample = await base_generate(
+                args,
+                sample,
+                sampling_params,
+                prompt_ids=prompt_ids,
+                session_id=get_session_id(sample),
+                on_text=executor.on_text if executor else None,
+            )
 
-        if not tool_calls:
-            break
+            sample.messages.append(
+                {
+                    "role": "assistant",
+                    "content": sample.response.removesuffix(state.tokenizer.eos_token),
+                }
+            )
+            if token_buffer:
+                token_buffer.update(sample, len(sample.messages))
+            sample.response_message = prompter.parse_assistant_content(sample.response)
+            parsed_messages[len(sample.messages) - 1] = sample.response_message
+            tool_calls = sample.response_message.get("tool_calls") or []
 
-        tool_call_tasks = [mcp_state.call_tool(t) for t in tool_calls]
-        tool_responses = await asyncio.gather(*tool_call_tasks)
+            # A single sequence cannot continue after a truncated or aborted turn.
+            if not tool_calls or (single_sequence and not token_buffer.extendable):
+                break
+
+            if executor:
+                tool_responses = await executor.join(tool_calls)
+            else:
+                tool_call_tasks = [mcp_state.call_tool(t) for t in tool_calls]
+                tool_responses = await asyncio.gather(*tool_call_tasks)
+        finally:
+            # The calls dispatched while decoding must not outlive the turn, whether
+            # it ended without tool calls or failed.
+            if executor:
+                executor.cancel()
         sample.messages.extend(tool_responses)
 
     else:
@@ -101,30 +198,52 @@ async def agent_loop(
             Sample(
                 group_index=sample.group_index,
                 index=sample.index,
-                messages=deepcopy(sample.messages),
+                messages=sample.messages.view(),
                 prompt=sample.prompt,
                 label=sample.label,
                 status=Sample.Status.PENDING,
                 metadata=sample.metadata,
-                train_metadata=None,
+                # Keep the tool schemas in the prefix-stable layout, since dropping them
+                # would rewrite the first turn.
+                train_metadata={"tools": mcp_state.tools} if prefix_stable else None,
             )
         )
         sample = samples[-1]
-        sample.messages[0] = build_system_message(max_steps, max_steps)
-        sample = await base_generate(args, sample, sampling_params)
+        if prefix_stable:
+            sample.messages.append(build_step_message(max_steps, max_steps))
+        else:
+            sample.messages[0] = build_system_message(max_steps, max_steps)
+        prompt_ids = (
+            token_buffer.get_prompt_ids(sample.messages) if token_buffer else None
+        )
+        sample = await base_generate(
+            args,
+            sample,
+            sampling_params,
+            prompt_ids=prompt_ids,
+            session_id=get_session_id(sample),
+        )
         sample.messages.append(
             {
                 "role": "assistant",
                 "content": sample.response.removesuffix(state.tokenizer.eos_token),
             }
         )
+        if token_buffer:
+            token_buffer.update(sample, len(sample.messages))
         sample.response_message = prompter.parse_assistant_content(sample.response)
+        parsed_messages[len(sample.messages) - 1] = sample.response_message
 
     sample = samples[-1]
     for i, message in enumerate(sample.messages):
-        if message["role"] == "assistant":
+        if i in parsed_messages:
+            sample.messages[i] = parsed_messages[i]
+        elif message["role"] == "assistant":
             sample.messages[i] = prompter.parse_assistant_content(message["content"])
 
+    if single_sequence:
+        return [build_sequence_sample(args, sample, token_buffer)]
+
     # Temporary padding to avoid trimming
     padding_num = (max_steps + 1) - len(samples)
     if padding_num > 0:
@@ -141,3 +260,25 @@ async def agent_loop(
         ] + samples
 
     return samples
+
+
+def build_sequence_sample(
+    args: Namespace, sample: Sample, token_buffer: TrajectoryTokenBuffer
+) -> Sample:
+    """
+    Turns the last step into a single training sequence of the whole trajectory.
+
+    Everything after the first prompt is the response, where the sampled assistant
+    spans are trained (loss_mask=1) and the rendered tool and system spans are not.
+    """
+    state = GenerateState(args)
+
+    sample.tokens = token_buffer.tokens
+    sample.response_length = token_buffer.response_length
+    sample.loss_mask = token_buffer.loss_mask
+    sample.rollout_log_probs = token_buffer.rollout_log_probs
+    sample.response = state.tokenizer.decode(
+        sample.tokens[len(sample.tokens) - sample.response_length :]
+    )
+
+    return sample
@@ -0,0 +1,19 @@
+from .cache import VerdictCache
+from .cascade import CascadeLLMJudge
+from .endpoints import JudgeEndpoint, JudgeEndpointPool
+from .pairwise import PairwiseLLMJudge, count_judge_requests
+from .scheduler import JudgeGroup, JudgeScheduler, judge_group_scope
+from .serializer import TrajectorySerializer
+
+__all__ = [
+    "CascadeLLMJudge",
+    "JudgeEndpoint",
+    "JudgeEndpointPool",
+    "JudgeGroup",
+    "JudgeScheduler",
+    "PairwiseLLMJudge",
+    "TrajectorySerializer",
+    "VerdictCache",
+    "count_judge_requests",
+    "judge_group_scope",
+]
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from cachetools import LRUCache
+
+from qqr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class VerdictCache:
+    """
+    Content-addressed cache of LLM judge verdicts.
+
+    Verdicts are keyed by a hash of the judge model and the request messages (system
+    prompt, query and both paths), and kept in an in-memory LRU cache in front of an
+    optional SQLite database, so that they survive restarts and can be shared by reruns.
+
+    Concurrent requests for the same key are coalesced into one upstream call, and only
+    successful verdicts (not None) are cached.
+    """
+
+    def __init__(self, maxsize: int = 65536, path: str | None = None):
+        """
+        Args:
+            maxsize: Maximum number of verdicts kept in memory and on disk, evicted in
+                LRU order.
+            path: Path of the SQLite database. Verdicts are only kept in memory if None.
+        """
+        self.maxsize = maxsize
+        self.path = path
+
+        self._memory = LRUCache(maxsize=maxsize)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self._db: sqlite3.Connection | None = None
+        self._db_size = 0
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict]) -> str:
+        content = json.dumps([model, messages], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @property
+    def db(self) -> sqlite3.Connection | None:
+        if self._db is None and self.path is not None:
+            self._db = sqlite3.connect(self.path, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS verdicts_accessed ON verdicts (accessed)"
+            )
+            self._db_size = self._db.execute(
+                "SELECT COUNT(*) FROM verdicts"
+            ).fetchone()[0]
+        return self._db
+
+    def get(self, key: str) -> Any | None:
+        if key in self._memory:
+            return self._memory[key]
+
+        if self.db is None:
+            return None
+
+        row = self.db.execute(
+            "SELECT value FROM verdicts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.db.execute(
+            "UPDATE verdicts SET accessed = ? WHERE key = ?", (time.time(), key)
+        )
+        value = json.loads(row[0])
+        self._memory[key] = value
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+
+        if self.db is None:
+            return
+
+        inserted = self.db.execute(
+            "INSERT OR IGNORE INTO verdicts (key, value, accessed) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time()),
+        ).rowcount
+        self._db_size += inserted
+
+        if self._db_size > self.maxsize:
+            self.db.execute(
+                "DELETE FROM verdicts WHERE key IN "
+                "(SELECT key FROM verdicts ORDER BY accessed LIMIT ?)",
+                (self._db_size - self.maxsize,),
+            )
+            self._db_size = self.maxsize
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any | None]]
+    ) -> Any | None:
+        """Returns the cached verdict, or computes it once for all concurrent callers."""
+        metrics.inc("llm_judge/cache/requests")
+
+        try:
+            value = self.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"[VerdictCache] Failed to read verdict: {e}")
+            value = None
+
+        if value is not None:
+            metrics.inc("llm_judge/cache/hits")
+            return value
+
+        future = self._inflight.get(key)
+        if future is None:
+            metrics.inc("llm_judge/cache/misses")
+            future = asyncio.ensure_future(self._compute(key, compute))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            metrics.inc("llm_judge/cache/coalesced")
+
+        # Shielded, so that a cancelled caller does not cancel the others.
+        return await asyncio.shield(future)
+
+    async def _compute(
+        self, key: str, compute: Callable[[], Awaitable[Any | None]]
+    ) -> Any | None:
+        value = await compute()
+        if value is not None:
+            try:
+                self.set(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"[VerdictCache] Failed to write verdict: {e}")
+        return value
+
+
+metrics.register_ratio(
+    "llm_judge/cache/hit_rate", "llm_judge/cache/hits", "llm_judge/cache/requests"
+)
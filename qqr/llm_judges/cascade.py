@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+from qqr.schemas import LLMJudge
+from qqr.utils.metrics import metrics
+
+from .pairwise import PairwiseLLMJudge, count_judge_requests
+
+
+class CascadeLLMJudge(LLMJudge):
+    """
+    Two-tier judge, where a fast judge settles the clear comparisons and the strong
+    judge the close ones.
+
+    A comparison is escalated to the strong judge when the fast verdict fails (request
+    or parsing) or when its score margin is under `escalation_margin`. Bidirectional
+    comparisons are escalated as a whole, so that both directions are scored by the same
+    judge. Each tier keeps its own concurrency limit, timeout and retries, e.g. a small
+    model behind a local endpoint with a short timeout and no retries.
+    """
+
+    def __init__(
+        self,
+        fast_judge: PairwiseLLMJudge,
+        strong_judge: PairwiseLLMJudge,
+        escalation_margin: float = 2.0,
+    ):
+        """
+        Args:
+            fast_judge: The judge of every comparison.
+            strong_judge: The judge of the escalated comparisons.
+            escalation_margin: Score margin of a single verdict under which the
+                comparison is escalated, doubled for the bidirectional ones.
+        """
+        self.fast_judge = fast_judge
+        self.strong_judge = strong_judge
+        self.escalation_margin = escalation_margin
+
+    async def compare(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        layout: str = "interleaved",
+    ) -> tuple[float, float]:
+        metrics.inc("llm_judge/cascade/comparisons")
+
+        scores = await self.fast_compare(
+            messages_a, messages_b, query=query, layout=layout
+        )
+        if scores is not None and abs(scores[0] - scores[1]) >= self.escalation_margin:
+            return scores
+
+        metrics.inc("llm_judge/cascade/escalations")
+        start_time = time.perf_counter()
+        with count_judge_requests() as num_calls:
+            scores = await self.strong_judge.compare(
+                messages_a, messages_b, query=query, layout=layout
+            )
+        metrics.inc("llm_judge/cascade/strong_calls", num_calls[0])
+        metrics.observe(
+            "llm_judge/cascade/strong_latency", time.perf_counter() - start_time
+        )
+
+        return scores
+
+    async def bidirectional_compare(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        shared: str | None = None,
+        **kwargs,
+    ) -> tuple[float, float, dict]:
+        metrics.inc("llm_judge/cascade/comparisons")
+
+        # Each tier lays out the comparisons sharing a trajectory with its own prompts.
+        layout = self.fast_judge.get_layout(shared)
+        forward, backward = await asyncio.gather(
+            self.fast_compare(messages_a, messages_b, query=query, layout=layout),
+            self.fast_compare(messages_b, messages_a, query=query, layout=layout),
+        )
+        if forward is not None and backward is not None:
+            score_a = forward[0] + backward[1]
+            score_b = forward[1] + backward[0]
+            if abs(score_a - score_b) >= 2 * self.escalation_margin:
+                return score_a, score_b, kwargs
+
+        metrics.inc("llm_judge/cascade/escalations")
+        start_time = time.perf_counter()
+        # The strong judge may skip the swapped comparison, so count its requests.
+        with count_judge_requests() as num_calls:
+            result = await self.strong_judge.bidirectional_compare(
+                messages_a, messages_b, query=query, shared=shared, **kwargs
+            )
+        metrics.inc("llm_judge/cascade/strong_calls", num_calls[0])
+        metrics.observe(
+            "llm_judge/cascade/strong_latency", time.perf_counter() - start_time
+        )
+
+        return result
+
+    async def fast_compare(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        layout: str = "interleaved",
+    ) -> tuple[float, float] | None:
+        start_time = time.perf_counter()
+        with count_judge_requests() as num_calls:
+            scores = await self.fast_judge.get_scores(
+                messages_a, messages_b, query=query, layout=layout
+            )
+        metrics.inc("llm_judge/cascade/fast_calls", num_calls[0])
+        metrics.observe(
+            "llm_judge/cascade/fast_latency", time.perf_counter() - start_time
+        )
+
+        if scores is None:
+            metrics.inc("llm_judge/cascade/fast_failures")
+        return scores
+
+    def process_messages(self, messages: list[dict]) -> tuple[list[dict], str]:
+        return self.strong_judge.process_messages(messages)
+
+
+metrics.register_ratio(
+    "llm_judge/cascade/escalation_rate",
+    "llm_judge/cascade/escalations",
+    "llm_judge/cascade/comparisons",
+)
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from functools import partial
+from urllib.parse import urlparse
+
+from openai import APIStatusError, AsyncOpenAI, RateLimitError
+
+from qqr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JudgeEndpoint:
+    """An OpenAI-compatible replica of the judge, with its load and circuit breaker."""
+
+    def __init__(self, base_url: str, api_key: str | None, timeout: float):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client = None
+
+        self.name = urlparse(base_url).netloc or base_url
+        self.num_in_flight = 0
+        self.latency: float | None = None
+        self.num_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            # The pool retries on another endpoint instead.
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                max_retries=0,
+            )
+        return self._client
+
+    def is_available(self, now: float, failure_threshold: int) -> bool:
+        """Whether the circuit is closed, or half-open and not probed yet."""
+        if self.num_failures < failure_threshold:
+            return True
+        return now >= self.open_until and not self.probing
+
+    def get_cost(self) -> tuple[float, int]:
+        """
+        Expected latency of one more request, then in-flight count, so that unmeasured
+        endpoints are tried first and in turn.
+        """
+        return (self.num_in_flight + 1) * (self.latency or 0.0), self.num_in_flight
+
+
+class EndpointStream:
+    """
+    Streamed response of an endpoint, which is busy until the stream is consumed.
+
+    `on_close` is called once with the error of the stream, if any, when it is closed.
+    """
+
+    def __init__(self, stream, on_close: Callable[[Exception | None], None]):
+        self.stream = stream
+        self.on_close = on_close
+        self.error: Exception | None = None
+        self.closed = False
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        try:
+            async for chunk in self.stream:
+                yield chunk
+        except Exception as e:
+            self.error = e
+            raise
+
+    async def close(self) -> None:
+        try:
+            await self.stream.close()
+        finally:
+            if not self.closed:
+                self.closed = True
+                self.on_close(self.error)
+
+
+class JudgeEndpointPool:
+    """
+    Spreads the judge requests over several OpenAI-compatible replicas.
+
+    A request goes to the available endpoint with the lowest in-flight count times
+    latency (moving average), and is retried on another endpoint if it fails. After
+    `failure_threshold` consecutive failures, the circuit of an endpoint opens for
+    `cooldown` seconds, then a single request probes it before it takes traffic again.
+    Client errors are raised without retrying, since another replica would refuse the
+    same request. Rate limits are back-pressure rather than failures of a replica, and
+    are left to the scheduler of the judge. Streamed requests count as in flight, and
+    their latency is measured, until the stream is closed.
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        api_key: str | None = None,
+        timeout: float = 60,
+        max_attempts: int = 3,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        latency_smoothing: float = 0.2,
+    ):
+        """
+        Args:
+            base_urls: Base urls of the replicas.
+            api_key: API key shared by the replicas.
+            timeout: Timeout of a request to a replica, in seconds.
+            max_attempts: Max attempts of a request, each on a different replica when
+                there are enough.
+            failure_threshold: Consecutive failures opening the circuit of a replica.
+            cooldown: Seconds before a replica with an open circuit is probed again.
+            latency_smoothing: Weight of the last latency in its moving average.
+        """
+        if not base_urls:
+            raise ValueError("At least one judge endpoint is required.")
+
+        self.endpoints = [JudgeEndpoint(url, api_key, timeout) for url in base_urls]
+        self.max_attempts = max_attempts
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_smoothing = latency_smoothing
+
+    def select(self, excluded: list[JudgeEndpoint]) -> JudgeEndpoint:
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e not in excluded] or self.endpoints
+
+        available = [
+            e for e in candidates if e.is_available(now, self.failure_threshold)
+        ]
+        if not available:
+            # Every circuit is open, try the one closest to its probe.
+            return min(candidates, key=lambda e: e.open_until)
+
+        endpoint = min(available, key=lambda e: e.get_cost())
+        if endpoint.num_failures >= self.failure_threshold:
+            endpoint.probing = True
+        return endpoint
+
+    async def create(self, **kwargs):
+        """`chat.completions.create` on the best endpoint, with failover."""
+        tried = []
+        for attempt in range(self.max_attempts):
+            endpoint = self.select(tried)
+            tried.append(endpoint)
+
+            endpoint.num_in_flight += 1
+            start_time = time.perf_counter()
+            streaming = False
+            try:
+                response = await endpoint.client.chat.completions.create(**kwargs)
+            except asyncio.CancelledError:
+                endpoint.probing = False
+                raise
+            except RateLimitError:
+                endpoint.probing = False
+                metrics.inc(f"llm_judge/endpoints/{endpoint.name}/rate_limited")
+                raise
+            except APIStatusError as e:
+                if e.status_code < 500:
+                    endpoint.probing = False
+                    raise
+                self.record_failure(endpoint, e)
+                if attempt == self.max_attempts - 1:
+                    raise
+            except Exception as e:
+                self.record_failure(endpoint, e)
+                if attempt == self.max_attempts - 1:
+                    raise
+            else:
+                if kwargs.get("stream"):
+                    streaming = True
+                    return EndpointStream(
+                        response, partial(self.close_stream, endpoint, start_time)
+                    )
+                self.record_success(endpoint, time.perf_counter() - start_time)
+                return response
+            finally:
+                if not streaming:
+                    endpoint.num_in_flight -= 1
+
+    def close_stream(
+        self, endpoint: JudgeEndpoint, start_time: float, error: Exception | None
+    ) -> None:
+        endpoint.num_in_flight -= 1
+        if error is None:
+            self.record_success(endpoint, time.perf_counter() - start_time)
+        else:
+            self.record_failure(endpoint, error)
+
+    def record_success(self, endpoint: JudgeEndpoint, latency: float) -> None:
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency += self.latency_smoothing * (latency - endpoint.latency)
+        endpoint.num_failures = 0
+        endpoint.probing = False
+
+        metrics.inc(f"llm_judge/endpoints/{endpoint.name}/requests")
+        metrics.observe(f"llm_judge/endpoints/{endpoint.name}/latency", latency)
+
+    def record_failure(self, endpoint: JudgeEndpoint, error: Exception) -> None:
+        failed_probe = endpoint.probing
+        endpoint.num_failures += 1
+        endpoint.probing = False
+
+        metrics.inc(f"llm_judge/endpoints/{endpoint.name}/requests")
+        metrics.inc(f"llm_judge/endpoints/{endpoint.name}/errors")
+
+        # Requests sent before the circuit opened do not open it again.
+        if endpoint.num_failures == self.failure_threshold or failed_probe:
+            endpoint.open_until = time.monotonic() + self.cooldown
+            metrics.inc(f"llm_judge/endpoints/{endpoint.name}/circuit_opens")
+            logger.warning(
+                f"[JudgeEndpointPool] Circuit of {endpoint.name} opened for "
+                f"{self.cooldown}s after {endpoint.num_failures} failures: {error}"
+            )
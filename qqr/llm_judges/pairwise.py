@@ -0,0 +1,688 @@
+import asyncio
+import contextvars
+import logging
+import math
+import random
+import re
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import AbstractAsyncContextManager, contextmanager
+
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+from qqr.data.text import estimate_num_tokens
+from qqr.schemas import LLMJudge
+from qqr.utils.metrics import metrics, percentile
+
+from .cache import VerdictCache
+from .endpoints import JudgeEndpointPool
+from .scheduler import JudgeScheduler
+from .serializer import TrajectorySerializer
+
+logger = logging.getLogger(__name__)
+
+# Counters of the verdicts requested by the current task and the tasks it creates, one
+# per enclosing `count_judge_requests` scope.
+judge_requests: contextvars.ContextVar[tuple[list[int], ...]] = contextvars.ContextVar(
+    "judge_requests", default=()
+)
+
+
+@contextmanager
+def count_judge_requests() -> Iterator[list[int]]:
+    """
+    Counts the verdicts requested within the scope, cache hits excluded, including those
+    of the nested scopes.
+    """
+    counter = [0]
+    token = judge_requests.set((*judge_requests.get(), counter))
+    try:
+        yield counter
+    finally:
+        judge_requests.reset(token)
+
+
+class PairwiseLLMJudge(LLMJudge):
+    """
+    LLM judge comparing the paths and answers of two agents on the same query.
+
+    The judge is prompted with the query, both reasoning paths and both answers. In the
+    verbose and compact modes its response is parsed for the combined scores of Agent_A
+    and Agent_B. In the winner mode it only names the winner (A, B or Tie), which is
+    turned into scores summing to 10, weighted by its log probs when available.
+
+    With `stream`, the scores are parsed while the response is streamed, and the stream
+    is closed as soon as both are captured, skipping whatever the judge writes after.
+
+    With `bidirectional_margin`, the swapped comparison that cancels the position bias
+    is only requested when the first one is closer than the margin. A `calibration_rate`
+    fraction of the decisive comparisons is still swapped, to measure how often this
+    changes the verdict.
+
+    With `hedge_quantile`, a request still running after this quantile of the recent
+    latencies is sent again, keeping whichever response comes first, so that a slow
+    request does not hold back the tournament round waiting for it.
+
+    Given the trajectory `shared` by the bidirectional comparisons of a topology (the
+    pivot of the anchor comparisons) and a `sequential_system_prompt`, the prompts show
+    the path and answer of Agent_A, then those of Agent_B, and the comparison with the
+    shared trajectory as Agent_A is requested first. Its prompt starts with the same
+    query and shared trajectory for every comparison against it, which providers with
+    prefix caching reuse. The swapped comparison shows it last, so that the position
+    bias still cancels out.
+    """
+
+    modes = ("verbose", "compact", "winner")
+    layouts = ("interleaved", "sequential")
+    winner_labels = ("A", "B", "Tie")
+
+    def __init__(
+        self,
+        system_prompt: str,
+        model: str,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        concurrency_limit: int = 10,
+        timeout: float = 60,
+        max_retries: int = 10,
+        scheduler: JudgeScheduler | None = None,
+        endpoints: JudgeEndpointPool | None = None,
+        cache: VerdictCache | None = None,
+        serializer: TrajectorySerializer | None = None,
+        mode: str = "verbose",
+        sequential_system_prompt: str | None = None,
+        stream: bool = False,
+        bidirectional_margin: float | None = None,
+        calibration_rate: float = 0.0,
+        hedge_quantile: float | None = None,
+        max_hedges: int = 4,
+        hedge_window: int = 256,
+    ):
+        """
+        Args:
+            system_prompt: The judge instructions, including the output format.
+            model: The judge model.
+            api_key: API key of the OpenAI-compatible judge endpoint.
+            base_url: Base url of the OpenAI-compatible judge endpoint.
+            concurrency_limit: Max concurrent requests to the judge.
+            timeout: Timeout of a judge request, in seconds.
+            max_retries: Max retries of a failed judge request. When the scheduler
+                controls the rate, each retry waits for it again instead of being
+                sent by the client, so that rate limits reach the scheduler.
+            scheduler: Scheduler of the requests, e.g. shared by the judges of an
+                endpoint, instead of the `concurrency_limit` semaphore.
+            endpoints: Replicas of the judge to balance the requests over, instead of
+                `base_url`.
+            cache: Cache of verdicts, skipping the requests already judged.
+            serializer: Serializer of the paths, compact and within a token budget,
+                instead of the repr of `process_messages`.
+            mode: The output contract of the system prompt, one of `modes`.
+            sequential_system_prompt: The judge instructions of the sequential layout,
+                describing each path followed by its answer. The comparisons sharing a
+                trajectory are interleaved too if None.
+            stream: Stream the responses and stop once the scores are parsed. Not
+                used in the winner mode, whose responses are a few tokens long.
+            bidirectional_margin: Score margin from which a single comparison is
+                decisive. Always compares both ways if None.
+            calibration_rate: Fraction of the decisive comparisons still compared
+                both ways, to measure the agreement with the full bidirectional mode.
+            hedge_quantile: Quantile of the recent latencies after which a request is
+                hedged, e.g. 0.9. Never hedged if None, nor when streaming.
+            max_hedges: Max hedged requests in flight, on top of the concurrency limit.
+            hedge_window: Number of recent latencies the quantile is taken over.
+        """
+        if mode not in self.modes:
+            raise ValueError(
+                f"Unknown judge mode '{mode}', expected one of {self.modes}."
+            )
+
+        self.system_prompt = system_prompt
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self.concurrency_limit = concurrency_limit
+        self._semaphore: asyncio.Semaphore | None = None
+        self.scheduler = scheduler
+        self.endpoints = endpoints
+
+        self.cache = cache
+        self.serializer = serializer
+        self.mode = mode
+        self.sequential_system_prompt = sequential_system_prompt
+        self.stream = stream and mode != "winner"
+        self.bidirectional_margin = bidirectional_margin
+        self.calibration_rate = calibration_rate
+
+        self.hedge_quantile = hedge_quantile
+        self.max_hedges = max_hedges
+        self.num_hedges = 0
+        self.latencies: deque[float] = deque(maxlen=hedge_window)
+        self.mean_completion_tokens = 0.0
+
+        self.score_a_pattern = re.compile(
+            r'"combined_scores"\s*:\s*\{[^{}]*?"Agent_A"\s*:\s*([0-9]+(?:\.[0-9]+)?)',
+            re.S | re.I,
+        )
+        self.score_b_pattern = re.compile(
+            r'"combined_scores"\s*:\s*\{[^{}]*?"Agent_B"\s*:\s*([0-9]+(?:\.[0-9]+)?)',
+            re.S | re.I,
+        )
+        self.winner_pattern = re.compile(
+            r'"winner"\s*:\s*"(?P<winner>Agent_A|Agent_B|Tie)"', re.I
+        )
+        self.winner_label_pattern = re.compile(
+            r"\b(?:Agent_)?(?P<winner>A|B|Tie)\b", re.I
+        )
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                max_retries=0 if self.retries_scheduled else self.max_retries,
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Lazy-initialized semaphore that binds to the current running Event Loop.
+
+        Using lazy initialization prevents "Future attached to a different loop" errors
+        when the server instance persists across multiple asyncio.run() calls or
+        event loop restarts.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency_limit)
+        return self._semaphore
+
+    async def create_completion(self, **kwargs):
+        """Requests a completion, hedged if it takes longer than usual."""
+        hedge_delay = self.get_hedge_delay()
+        if hedge_delay is None or kwargs.get("stream"):
+            return await self.send_completion(**kwargs)
+
+        tasks = [asyncio.ensure_future(self.send_completion(**kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done and self.num_hedges < self.max_hedges:
+                metrics.inc("llm_judge/hedges")
+                tasks.append(asyncio.ensure_future(self.send_completion(**kwargs)))
+
+            self.num_hedges += len(tasks) - 1
+            try:
+                winner = await first_completed(tasks)
+            finally:
+                self.num_hedges -= len(tasks) - 1
+
+            if winner is not tasks[0]:
+                metrics.inc("llm_judge/hedge_wins")
+            return winner.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def send_completion(self, **kwargs):
+        start_time = time.perf_counter()
+        if self.endpoints is not None:
+            response = await self.endpoints.create(**kwargs)
+        else:
+            response = await self.client.chat.completions.create(**kwargs)
+
+        if not kwargs.get("stream"):
+            self.latencies.append(time.perf_counter() - start_time)
+        return response
+
+    def get_hedge_delay(self) -> float | None:
+        """Returns the delay before hedging, once enough latencies were observed."""
+        if self.hedge_quantile is None or len(self.latencies) < 20:
+            return None
+        return percentile(sorted(self.latencies), 100 * self.hedge_quantile)
+
+    def slot(self, num_tokens: int = 0) -> AbstractAsyncContextManager:
+        """Waits for a free request slot, and the token budget with a scheduler."""
+        if self.scheduler is None:
+            return self.semaphore
+        return self.scheduler.acquire(num_tokens)
+
+    def estimate_num_tokens(self, messages: list[dict]) -> int:
+        """Estimated prompt and completion tokens of a request."""
+        num_tokens = sum(estimate_num_tokens(m["content"]) for m in messages)
+        return num_tokens + int(self.mean_completion_tokens)
+
+    async def compare(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        layout: str = "interleaved",
+    ) -> tuple[float, float]:
+        scores = await self.get_scores(
+            messages_a, messages_b, query=query, layout=layout
+        )
+
+        if scores is None:
+            return 5.0, 5.0
+
+        score_a, score_b = scores
+        return score_a, score_b
+
+    async def get_scores(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        layout: str = "interleaved",
+    ) -> tuple[float, float] | None:
+        """Like `compare`, but returns None if the verdict failed."""
+        messages = self.build_messages(messages_a, messages_b, query, layout=layout)
+
+        if self.cache is None:
+            return await self.judge(messages)
+
+        return await self.cache.get_or_compute(
+            VerdictCache.make_key(self.model, messages),
+            lambda: self.judge(messages),
+        )
+
+    async def bidirectional_compare(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        shared: str | None = None,
+        **kwargs,
+    ) -> tuple[float, float, dict]:
+        """
+        Args:
+            shared: The trajectory compared with the other ones of the group, "a" or
+                "b", e.g. the pivot of the anchor comparisons.
+        """
+        layout = self.get_layout(shared)
+        if layout == "sequential" and shared == "b":
+            # Swapped, so that the comparison requested first shows it first.
+            score_b, score_a, metadata = await self.bidirectional_compare(
+                messages_b, messages_a, query=query, shared="a", **kwargs
+            )
+            return score_a, score_b, metadata
+
+        if self.bidirectional_margin is not None:
+            return await self.adaptive_bidirectional_compare(
+                messages_a, messages_b, query=query, layout=layout, **kwargs
+            )
+
+        results = await asyncio.gather(
+            self.compare(messages_a, messages_b, query=query, layout=layout),
+            self.compare(messages_b, messages_a, query=query, layout=layout),
+        )
+
+        score_a = results[0][0] + results[1][1]
+        score_b = results[0][1] + results[1][0]
+
+        return score_a, score_b, kwargs
+
+    async def adaptive_bidirectional_compare(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        layout: str = "interleaved",
+        **kwargs,
+    ) -> tuple[float, float, dict]:
+        """
+        Compares A with B, and B with A only if the first verdict is not decisive.
+
+        The scores of a single comparison are doubled, to stay on the scale of the
+        bidirectional ones.
+        """
+        forward_a, forward_b = await self.compare(
+            messages_a, messages_b, query=query, layout=layout
+        )
+        metrics.inc("llm_judge/bidirectional/compares")
+
+        decisive = abs(forward_a - forward_b) >= self.bidirectional_margin
+        calibrating = decisive and random.random() < self.calibration_rate
+        if decisive and not calibrating:
+            metrics.inc("llm_judge/bidirectional/skipped")
+            return 2 * forward_a, 2 * forward_b, kwargs
+
+        backward_b, backward_a = await self.compare(
+            messages_b, messages_a, query=query, layout=layout
+        )
+        score_a = forward_a + backward_a
+        score_b = forward_b + backward_b
+
+        if calibrating:
+            forward_sign = math.copysign(1, forward_a - forward_b)
+            metrics.inc("llm_judge/bidirectional/calibrations")
+            if (backward_a - backward_b) * forward_sign <= 0:
+                metrics.inc("llm_judge/bidirectional/flips")
+            if (score_a - score_b) * forward_sign > 0:
+                metrics.inc("llm_judge/bidirectional/agreements")
+
+        return score_a, score_b, kwargs
+
+    def get_layout(self, shared: str | None) -> str:
+        """Returns the layout of the comparisons sharing the `shared` trajectory."""
+        if shared is None or self.sequential_system_prompt is None:
+            return "interleaved"
+        return "sequential"
+
+    def build_messages(
+        self,
+        messages_a: list[dict],
+        messages_b: list[dict],
+        query: str,
+        layout: str = "interleaved",
+    ) -> list[dict]:
+        """
+        Args:
+            layout: One of `layouts`, either both paths then both answers, or the path
+                and answer of Agent_A then those of Agent_B.
+        """
+        if layout not in self.layouts:
+            raise ValueError(
+                f"Unknown judge layout '{layout}', expected one of {self.layouts}."
+            )
+
+        if self.serializer is not None:
+            trajectory_a, answer_a = self.serializer.serialize(messages_a)
+            trajectory_b, answer_b = self.serializer.serialize(messages_b)
+        else:
+            trajectory_a, answer_a = self.process_messages(messages_a)
+            trajectory_b, answer_b = self.process_messages(messages_b)
+
+        # Agent_A is always shown first, so the scores parsed by label are also keyed by
+        # position, and the swapped comparisons are mapped back by their caller.
+        if layout == "sequential":
+            system_prompt = self.sequential_system_prompt
+            prompt = f"""<USER_QUERY>\n{query}\n</USER_QUERY>\n\n<PATH_A>\n{trajectory_a}\n</PATH_A>\n\n<Answer_A>\n{answer_a}\n</Answer_A>\n\n<PATH_B>\n{trajectory_b}\n</PATH_B>\n\n<Answer_B>\n{answer_b}\n</Answer_B>"""
+        else:
+            system_prompt = self.system_prompt
+            prompt = f"""<USER_QUERY>\n{query}\n</USER_QUERY>\n\n<PATH_A>\n{trajectory_a}\n</PATH_A>\n\n<PATH_B>\n{trajectory_b}\n</PATH_B>\n\n<Answer_A>\n{answer_a}\n</Answer_A>\n\n<Answer_B>\n{answer_b}\n</Answer_B>"""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+
+    @property
+    def retries_scheduled(self) -> bool:
+        """Whether the failed requests are retried through the scheduler."""
+        return self.scheduler is not None and self.scheduler.controls_rate
+
+    async def judge(self, messages: list[dict]) -> tuple[float, float] | None:
+        """Requests a verdict, returning None if it fails or cannot be parsed."""
+        num_tokens = self.estimate_num_tokens(messages)
+
+        for counter in judge_requests.get():
+            counter[0] += 1
+
+        num_attempts = self.max_retries + 1 if self.retries_scheduled else 1
+        for attempt in range(num_attempts):
+            if attempt > 0:
+                # Backs off like the client would, without holding a slot.
+                metrics.inc("llm_judge/scheduled_retries")
+                delay = min(0.5 * 2 ** (attempt - 1), 8.0)
+                await asyncio.sleep(delay * random.uniform(0.75, 1.0))
+
+            try:
+                return await self.request_verdict(messages, num_tokens)
+
+            except RateLimitError as e:
+                if self.scheduler is not None:
+                    self.scheduler.record_rate_limited(num_tokens)
+                logger.warning(f"[LLMJudge] Rate limited: {e}")
+
+            except (APIConnectionError, InternalServerError) as e:
+                logger.warning(f"[LLMJudge] Failed to get result: {e}")
+
+            except Exception as e:
+                logger.warning(f"[LLMJudge] Failed to get result: {e}")
+                return None
+
+        return None
+
+    async def request_verdict(
+        self, messages: list[dict], num_tokens: int
+    ) -> tuple[float, float] | None:
+        """Sends a single request once admitted, returning None if not parsed."""
+        if self.stream:
+            async with self.slot(num_tokens):
+                scores = await self.judge_streaming(messages, num_tokens)
+            if scores is None:
+                metrics.inc("llm_judge/parse_failures")
+            return scores
+
+        request_kwargs = {}
+        if self.mode == "winner":
+            request_kwargs = {"max_tokens": 4, "logprobs": True, "top_logprobs": 5}
+
+        async with self.slot(num_tokens):
+            start_time = time.perf_counter()
+            response = await self.create_completion(
+                messages=messages,
+                model=self.model,
+                temperature=0.0,
+                **request_kwargs,
+            )
+            self.record_usage(
+                response.usage, time.perf_counter() - start_time, num_tokens
+            )
+
+        if self.mode == "winner":
+            scores = self.parse_winner_scores(response.choices[0])
+        else:
+            scores = self.parse_judge_scores(response.choices[0].message.content)
+
+        if scores is None:
+            metrics.inc("llm_judge/parse_failures")
+        return scores
+
+    async def judge_streaming(
+        self, messages: list[dict], num_tokens: int = 0
+    ) -> tuple[float, float] | None:
+        start_time = time.perf_counter()
+        stream = await self.create_completion(
+            messages=messages,
+            model=self.model,
+            temperature=0.0,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        content = ""
+        usage = None
+        scores = None
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+
+                content += chunk.choices[0].delta.content
+                scores = self.parse_partial_judge_scores(content)
+                if scores is not None:
+                    metrics.inc("llm_judge/early_stops")
+                    metrics.observe(
+                        "llm_judge/time_to_verdict", time.perf_counter() - start_time
+                    )
+                    break
+        finally:
+            await stream.close()
+
+        self.record_usage(usage, time.perf_counter() - start_time, num_tokens)
+
+        if scores is None:
+            scores = self.parse_judge_scores(content)
+        return scores
+
+    def record_usage(
+        self, usage, latency: float, estimated_num_tokens: int = 0
+    ) -> None:
+        metrics.inc("llm_judge/requests")
+        metrics.observe("llm_judge/latency", latency)
+        if usage is not None:
+            metrics.observe("llm_judge/prompt_tokens", usage.prompt_tokens)
+            metrics.observe("llm_judge/completion_tokens", usage.completion_tokens)
+            metrics.inc("llm_judge/total_prompt_tokens", usage.prompt_tokens)
+            details = getattr(usage, "prompt_tokens_details", None)
+            if details is not None and details.cached_tokens:
+                metrics.inc("llm_judge/cached_prompt_tokens", details.cached_tokens)
+            self.mean_completion_tokens += 0.1 * (
+                usage.completion_tokens - self.mean_completion_tokens
+            )
+            if estimated_num_tokens > 0:
+                metrics.observe(
+                    "llm_judge/token_estimate_ratio",
+                    usage.total_tokens / estimated_num_tokens,
+                )
+
+        if self.scheduler is not None:
+            self.scheduler.record_response(
+                latency,
+                usage.total_tokens if usage is not None else None,
+                estimated_num_tokens,
+            )
+
+    def process_messages(self, messages: list[dict]) -> tuple[list[dict], str]:
+        step_idx = 0
+        trajectory = []
+        for message in messages[:-1]:
+            if message["role"] != "assistant":
+                continue
+
+            step_idx += 1
+            trajectory.append(
+                {
+                    "step": step_idx,
+                    "reasoning_content": message.get("reasoning_content", ""),
+                    "tool_calls": message.get("tool_calls", ""),
+                }
+            )
+
+        answer = "未回复"
+        if messages[-1]["role"] == "assistant":
+            answer = messages[-1].get("content") or answer
+
+        return trajectory, answer
+
+    def get_judge_scores(self, response: str) -> tuple[float, float]:
+        scores = self.parse_judge_scores(response)
+        if scores is None:
+            return 5.0, 5.0
+        return scores
+
+    def parse_winner_scores(self, choice) -> tuple[float, float] | None:
+        """
+        Scores the winner label of a completion choice.
+
+        The probabilities of the labels are read from the top log probs of the first
+        token, falling back to the label in the content (probability 1).
+        """
+        probs = dict.fromkeys(self.winner_labels, 0.0)
+
+        if choice.logprobs is not None and choice.logprobs.content:
+            for top_logprob in choice.logprobs.content[0].top_logprobs:
+                label = self.match_winner_label(top_logprob.token)
+                if label is not None:
+                    probs[label] += math.exp(top_logprob.logprob)
+
+        if sum(probs.values()) == 0.0:
+            match = self.winner_label_pattern.search(choice.message.content or "")
+            if match is None:
+                return None
+            probs[self.match_winner_label(match.group("winner"))] = 1.0
+
+        total = sum(probs.values())
+        prob_a = (probs["A"] + probs["Tie"] / 2) / total
+        return 10.0 * prob_a, 10.0 * (1.0 - prob_a)
+
+    def match_winner_label(self, token: str) -> str | None:
+        token = token.strip().lower()
+        if not token:
+            return None
+        for label in self.winner_labels:
+            # The label may be split into several tokens, e.g. "T" + "ie".
+            if label.lower().startswith(token) or token == f"agent_{label.lower()}":
+                return label
+        return None
+
+    def parse_partial_judge_scores(self, response: str) -> tuple[float, float] | None:
+        """Parses the scores of a partial response, once both are fully decoded."""
+        match_a = self.score_a_pattern.search(response)
+        match_b = self.score_b_pattern.search(response)
+
+        if not (match_a and match_b):
+            return None
+
+        # A score is complete once followed by something else than its digits.
+        for match in (match_a, match_b):
+            if match.end() == len(response) or response[match.end()] in "0123456789.":
+                return None
+
+        return float(match_a.group(1)), float(match_b.group(1))
+
+    def parse_judge_scores(self, response: str) -> tuple[float, float] | None:
+        try:
+            match_a = self.score_a_pattern.search(response)
+            match_b = self.score_b_pattern.search(response)
+
+            if match_a and match_b:
+                return float(match_a.group(1)), float(match_b.group(1))
+
+        except Exception:
+            pass
+
+        return None
+
+
+async def first_completed(tasks: list[asyncio.Task]) -> asyncio.Task:
+    """Returns the first task to succeed, or the last to fail if they all do."""
+    pending = set(tasks)
+    while True:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                return task
+        if not pending:
+            return done.pop()
+
+
+metrics.register_ratio(
+    "llm_judge/bidirectional/skip_rate",
+    "llm_judge/bidirectional/skipped",
+    "llm_judge/bidirectional/compares",
+)
+metrics.register_ratio(
+    "llm_judge/bidirectional/flip_rate",
+    "llm_judge/bidirectional/flips",
+    "llm_judge/bidirectional/calibrations",
+)
+metrics.register_ratio(
+    "llm_judge/bidirectional/agreement_rate",
+    "llm_judge/bidirectional/agreements",
+    "llm_judge/bidirectional/calibrations",
+)
+metrics.register_ratio(
+    "llm_judge/cached_token_rate",
+    "llm_judge/cached_prompt_tokens",
+    "llm_judge/total_prompt_tokens",
+)
+metrics.register_ratio("llm_judge/hedge_rate", "llm_judge/hedges", "llm_judge/requests")
+metrics.register_ratio(
+    "llm_judge/hedge_win_rate", "llm_judge/hedge_wins", "llm_judge/hedges"
+)
@@ -0,0 +1,282 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+from qqr.utils.metrics import metrics
+
+
+class JudgeGroup:
+    """The judge requests of a group, e.g. the comparisons of its tournament."""
+
+    _seq = itertools.count()
+
+    def __init__(self):
+        self.seq = next(self._seq)
+
+
+# Group of the judge requests of the current task, inherited by the tasks it creates.
+judge_group: contextvars.ContextVar[JudgeGroup | None] = contextvars.ContextVar(
+    "judge_group", default=None
+)
+
+
+@contextmanager
+def judge_group_scope() -> Iterator[JudgeGroup]:
+    """Attributes the judge requests made within the scope to a new group."""
+    group = JudgeGroup()
+    token = judge_group.set(group)
+    try:
+        yield group
+    finally:
+        judge_group.reset(token)
+
+
+class TokenBucket:
+    """Budget per minute, refilled continuously."""
+
+    def __init__(self, limit_per_minute: float):
+        self.capacity = limit_per_minute
+        self.tokens = limit_per_minute
+        self.rate = limit_per_minute / 60
+        self.updated = time.monotonic()
+
+    def get_delay(self, amount: float) -> float:
+        """Returns the seconds until `amount` can be consumed, at most the capacity."""
+        now = time.monotonic()
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.capacity)
+        self.updated = now
+
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing / self.rate, 0.0)
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+class JudgeScheduler:
+    """
+    Admission control of the judge requests shared by all the groups, which grants the
+    free slots by priority instead of in arrival order.
+
+    With the "group" policy, the requests of the earliest started group go first, so
+    that groups finish one after the other instead of all finishing late. A request
+    outside of any group, e.g. of an evaluation, is a group of its own started on
+    arrival. With `max_group_share`, a group holds at most this share of the slots while
+    requests of other groups are waiting, which keeps the later groups progressing.
+
+    With `rpm_limit` and `tpm_limit`, the requests also wait for the request and token
+    budgets of the provider, refilled continuously. The tokens of a request are
+    estimated beforehand, and corrected with its usage. With `adaptive_concurrency`, the
+    concurrency limit is halved on rate limits (and latencies over `latency_target`),
+    and otherwise grows by one slot per limit's worth of requests (AIMD).
+    """
+
+    policies = ("fifo", "group")
+
+    def __init__(
+        self,
+        concurrency_limit: int,
+        policy: str = "group",
+        max_group_share: float = 1.0,
+        rpm_limit: int | None = None,
+        tpm_limit: int | None = None,
+        adaptive_concurrency: bool = False,
+        latency_target: float | None = None,
+    ):
+        """
+        Args:
+            concurrency_limit: Max concurrent judge requests.
+            policy: Order of the waiting requests, one of `policies`.
+            max_group_share: Share of the slots a group may hold while others wait.
+            rpm_limit: Max requests per minute.
+            tpm_limit: Max tokens (prompt and completion) per minute.
+            adaptive_concurrency: Adapt the concurrency limit, up to
+                `concurrency_limit`, to the rate limits and latencies.
+            latency_target: Latency in seconds over which the concurrency limit is
+                decreased, when adaptive.
+        """
+        if policy not in self.policies:
+            raise ValueError(
+                f"Unknown scheduler policy '{policy}', expected one of {self.policies}."
+            )
+
+        self.max_concurrency_limit = concurrency_limit
+        self.concurrency_limit = float(concurrency_limit)
+        self.policy = policy
+        self.max_group_share = max_group_share
+        self.adaptive_concurrency = adaptive_concurrency
+        self.latency_target = latency_target
+
+        self.request_bucket = TokenBucket(rpm_limit) if rpm_limit else None
+        self.token_bucket = TokenBucket(tpm_limit) if tpm_limit else None
+        self.last_decrease_time = 0.0
+
+        self.num_running = 0
+        self.num_running_by_group: Counter[JudgeGroup] = Counter()
+        self.waiters: list[tuple] = []
+        self._seq = itertools.count()
+        self._dispatch_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def controls_rate(self) -> bool:
+        """Whether the scheduler keeps to budgets or adapts to rate limits."""
+        return (
+            self.request_bucket is not None
+            or self.token_bucket is not None
+            or self.adaptive_concurrency
+        )
+
+    @asynccontextmanager
+    async def acquire(self, num_tokens: int = 0) -> AsyncIterator[None]:
+        """
+        Waits for a slot and for the budgets of the request.
+
+        Args:
+            num_tokens: Estimated tokens of the request.
+        """
+        group = judge_group.get() or JudgeGroup()
+        start_time = time.perf_counter()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self.waiters,
+            (self.get_priority(group), next(self._seq), group, future, num_tokens),
+        )
+        self.dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled right after being granted a slot.
+            if future.done() and not future.cancelled():
+                self.release(group)
+            raise
+
+        metrics.observe(
+            "llm_judge/scheduler/wait_time", time.perf_counter() - start_time
+        )
+        try:
+            yield
+        finally:
+            self.release(group)
+
+    def record_response(
+        self, latency: float, num_tokens: int | None, estimated_num_tokens: int
+    ) -> None:
+        """
+        Corrects the token budget with the actual usage of a request, and grows the
+        concurrency limit unless the latency is over target.
+        """
+        if self.token_bucket is not None and num_tokens is not None:
+            self.token_bucket.consume(num_tokens - estimated_num_tokens)
+
+        if not self.adaptive_concurrency:
+            return
+
+        if self.latency_target is not None and latency > self.latency_target:
+            self.decrease_concurrency()
+        else:
+            self.concurrency_limit = min(
+                self.concurrency_limit + 1 / self.concurrency_limit,
+                self.max_concurrency_limit,
+            )
+            self.dispatch()
+
+    def record_rate_limited(self, estimated_num_tokens: int = 0) -> None:
+        """Refunds the tokens of a rate limited request, and backs off."""
+        if self.token_bucket is not None:
+            self.token_bucket.consume(-estimated_num_tokens)
+
+        metrics.inc("llm_judge/scheduler/rate_limited")
+        if self.adaptive_concurrency:
+            self.decrease_concurrency()
+
+    def decrease_concurrency(self) -> None:
+        # The requests in flight saw the same congestion, only back off once for them.
+        now = time.monotonic()
+        if now - self.last_decrease_time < 1.0:
+            return
+        self.last_decrease_time = now
+
+        self.concurrency_limit = max(self.concurrency_limit / 2, 1.0)
+        metrics.observe("llm_judge/scheduler/concurrency_limit", self.concurrency_limit)
+
+    def get_priority(self, group: JudgeGroup) -> int:
+        if self.policy == "fifo":
+            return 0
+        return group.seq
+
+    def get_max_group_slots(self) -> int:
+        return max(math.ceil(int(self.concurrency_limit) * self.max_group_share), 1)
+
+    def get_budget_delay(self, num_tokens: int) -> float:
+        delay = 0.0
+        if self.request_bucket is not None:
+            delay = max(delay, self.request_bucket.get_delay(1))
+        if self.token_bucket is not None:
+            delay = max(delay, self.token_bucket.get_delay(num_tokens))
+        return delay
+
+    def start(self, group: JudgeGroup, num_tokens: int) -> None:
+        self.num_running += 1
+        self.num_running_by_group[group] += 1
+
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None:
+            self.token_bucket.consume(num_tokens)
+
+    def release(self, group: JudgeGroup) -> None:
+        self.num_running -= 1
+        self.num_running_by_group[group] -= 1
+        if self.num_running_by_group[group] <= 0:
+            del self.num_running_by_group[group]
+
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        """Grants the free slots to the waiting requests, in order of priority."""
+        max_group_slots = self.get_max_group_slots()
+        while self.num_running < int(self.concurrency_limit) and self.waiters:
+            chosen = None
+            capped = []
+            while self.waiters:
+                waiter = heapq.heappop(self.waiters)
+                group, future = waiter[2], waiter[3]
+                if future.done():
+                    continue
+                if self.num_running_by_group[group] < max_group_slots:
+                    chosen = waiter
+                    break
+                capped.append(waiter)
+
+            # Only capped groups are waiting, rather than idling let the first one go.
+            if chosen is None and capped:
+                chosen = capped.pop(0)
+            for waiter in capped:
+                heapq.heappush(self.waiters, waiter)
+
+            if chosen is None:
+                break
+
+            # The next request waits for the budgets, without being overtaken.
+            delay = self.get_budget_delay(chosen[4])
+            if delay > 0:
+                heapq.heappush(self.waiters, chosen)
+                if self._dispatch_handle is None:
+                    self._dispatch_handle = asyncio.get_running_loop().call_later(
+                        delay, self.dispatch_later
+                    )
+                break
+
+            self.start(chosen[2], chosen[4])
+            chosen[3].set_result(None)
+
+    def dispatch_later(self) -> None:
+        self._dispatch_handle = None
+        self.dispatch()
@@ -0,0 +1,148 @@
+import json
+
+from cachetools import LRUCache
+
+from qqr.data.text import estimate_num_tokens, truncate_text
+from qqr.utils.metrics import metrics
+
+
+class TrajectorySerializer:
+    """
+    Serializes the trajectories shown to the judge, within a token budget per path.
+
+    Each step is a compact JSON line with its reasoning and tool calls (name and
+    arguments). Over budget, the longest reasoning blocks are cut down to a common
+    length, keeping their head and tail, before the whole path as a last resort. The
+    answer is kept whole.
+
+    Trajectories are cached by identity, so each one is serialized once for all the
+    comparisons of its group.
+    """
+
+    def __init__(
+        self,
+        max_path_tokens: int | None = None,
+        tokenizer=None,
+        cache_size: int = 1024,
+    ):
+        """
+        Args:
+            max_path_tokens: Token budget of a path. Unlimited if None.
+            tokenizer: Tokenizer counting the tokens, estimated from the characters if
+                None.
+            cache_size: Number of serialized trajectories kept.
+        """
+        self.max_path_tokens = max_path_tokens
+        self.tokenizer = tokenizer
+        # Keyed by id, with the messages kept alive so that their id is not reused.
+        self.cache: LRUCache[int, tuple[list[dict], tuple[str, str]]] = LRUCache(
+            maxsize=cache_size
+        )
+
+    def serialize(self, messages: list[dict]) -> tuple[str, str]:
+        """Returns the path and answer of a trajectory."""
+        metrics.inc("llm_judge/serializer/requests")
+        entry = self.cache.get(id(messages))
+        if entry is not None and entry[0] is messages:
+            metrics.inc("llm_judge/serializer/hits")
+            return entry[1]
+
+        steps, answer = self.get_steps(messages)
+        path = self.format_steps(steps)
+
+        num_tokens = self.count_tokens(path)
+        metrics.observe("llm_judge/serializer/raw_path_tokens", num_tokens)
+        if self.max_path_tokens is not None and num_tokens > self.max_path_tokens:
+            path, num_tokens = self.truncate(steps, num_tokens)
+            metrics.inc("llm_judge/serializer/truncations")
+        metrics.observe("llm_judge/serializer/path_tokens", num_tokens)
+
+        self.cache[id(messages)] = (messages, (path, answer))
+        return path, answer
+
+    def get_steps(self, messages: list[dict]) -> tuple[list[dict], str]:
+        steps = []
+        for message in messages[:-1]:
+            if message["role"] != "assistant":
+                continue
+
+            step = {"step": len(steps) + 1}
+            if message.get("reasoning_content"):
+                step["reasoning_content"] = message["reasoning_content"]
+            if message.get("tool_calls"):
+                step["tool_calls"] = [
+                    {
+                        "name": tool_call["function"]["name"],
+                        "arguments": tool_call["function"]["arguments"],
+                    }
+                    for tool_call in message["tool_calls"]
+                ]
+            steps.append(step)
+
+        answer = "未回复"
+        if messages[-1]["role"] == "assistant":
+            answer = messages[-1].get("content") or answer
+
+        return steps, answer
+
+    def format_steps(self, steps: list[dict]) -> str:
+        return "\n".join(
+            json.dumps(step, ensure_ascii=False, separators=(",", ":"))
+            for step in steps
+        )
+
+    def count_tokens(self, text: str) -> int:
+        if self.tokenizer is None:
+            return estimate_num_tokens(text)
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def truncate(self, steps: list[dict], num_tokens: int) -> tuple[str, int]:
+        """Cuts the longest reasoning blocks until the path fits in the budget."""
+        lengths = [self.count_tokens(s.get("reasoning_content", "")) for s in steps]
+
+        # The cut text is not as dense as the whole, so correct the excess a few times.
+        excess = num_tokens - self.max_path_tokens
+        for _ in range(3):
+            path = self.format_steps(self.cut_reasoning(steps, lengths, excess))
+            path_num_tokens = self.count_tokens(path)
+            if path_num_tokens <= self.max_path_tokens:
+                return path, path_num_tokens
+            excess += path_num_tokens - self.max_path_tokens
+
+        path = truncate_text(
+            path, max_len=len(path) * self.max_path_tokens // path_num_tokens
+        )
+        return path, self.count_tokens(path)
+
+    def cut_reasoning(
+        self, steps: list[dict], lengths: list[int], excess: int
+    ) -> list[dict]:
+        # The longest common length the blocks can be cut to, removing the excess.
+        low, high = 0, max(lengths, default=0)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if sum(max(n - mid, 0) for n in lengths) >= excess:
+                low = mid
+            else:
+                high = mid - 1
+        max_length = low
+
+        steps = [dict(step) for step in steps]
+        for step, length in zip(steps, lengths, strict=True):
+            if length <= max_length:
+                continue
+            if max_length == 0:
+                del step["reasoning_content"]
+                continue
+            text = step["reasoning_content"]
+            step["reasoning_content"] = truncate_text(
+                text, max_len=len(text) * max_length // length
+            )
+        return steps
+
+
+metrics.register_ratio(
+    "llm_judge/serializer/hit_rate",
+    "llm_judge/serializer/hits",
+    "llm_judge/serializer/requests",
+)
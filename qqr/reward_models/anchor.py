@@ -5,38 +5,108 @@ import pandas as pd
 import torch
 
 from qqr import registers
-from qqr.schemas import GroupRewardModel, LLMJudge
+from qqr.schemas import GroupRewardModel, GroupRewardSession, LLMJudge
+
+
+class AnchorSession(GroupRewardSession):
+    """
+    Compares every prediction against the pivot (index 0) as soon as both have arrived.
+    """
+
+    pivot_idx = 0
+
+    def __init__(
+        self,
+        reward_model: GroupRewardModel,
+        group_size: int,
+        query: str,
+        shared_first: bool = False,
+    ):
+        super().__init__(reward_model, group_size, query=query)
+
+        self.llm_judge: LLMJudge = reward_model.llm_judge
+        self.query = query
+        self.shared_first = shared_first
+        self.comparisons: dict[int, asyncio.Task] = {}
+
+    def on_submit(self, idx: int) -> None:
+        pivot_prediction = self.predictions[self.pivot_idx]
+        if pivot_prediction is None:
+            return
+
+        # The pivot releases every prediction that arrived before it.
+        candidates = range(self.group_size) if idx == self.pivot_idx else [idx]
+        for other_idx in candidates:
+            if (
+                other_idx == self.pivot_idx
+                or other_idx in self.comparisons
+                or self.predictions[other_idx] is None
+            ):
+                continue
+
+            self.comparisons[other_idx] = self.create_task(
+                self.llm_judge.bidirectional_compare(
+                    self.predictions[other_idx],
+                    pivot_prediction,
+                    query=self.query,
+                    shared="b" if self.shared_first else None,
+                    idx=other_idx,
+                )
+            )
+
+    async def get_anchor_scores(self) -> tuple[list[float], list[float]]:
+        """
+        Returns the scores of every prediction and of the pivot against it.
+
+        The pivot's own entries are left at 5.0.
+        """
+        assert all(p is not None for p in self.predictions), "Missing predictions."
+
+        other_scores = [5.0] * self.group_size
+        pivot_scores = [5.0] * self.group_size
+
+        results = await asyncio.gather(*self.comparisons.values())
+        for other_score, pivot_score, metadata in results:
+            idx = metadata["idx"]
+            other_scores[idx] = other_score
+            pivot_scores[idx] = pivot_score
+
+        return other_scores, pivot_scores
+
+    async def compute(self) -> list[float]:
+        other_scores, pivot_scores = await self.get_anchor_scores()
+        return self.reward_model.calculate_group_rewards(other_scores, pivot_scores)
 
 
 @registers.reward_model("anchor")
 class AnchorBasedRankingGroupRewardModel(GroupRewardModel):
-    def __init__(self, llm_judge: LLMJudge):
+    def __init__(self, llm_judge: LLMJudge, shared_first: bool = False):
+        """
+        Args:
+            shared_first: Pass the pivot to the judge as the trajectory shared by the
+                comparisons, shown first for the judge endpoint to reuse its prefix.
+        """
         super().__init__()
 
         self.llm_judge = llm_judge
+        self.shared_first = shared_first
+
+    def open_session(self, group_size: int, query: str) -> AnchorSession:
+        return AnchorSession(
+            self, group_size, query=query, shared_first=self.shared_first
+        )
 
     async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
-        group_size = len(predictions)
-
-        pivot_idx = 0
-        pivot_prediction = predictions[pivot_idx]
-        pivot_scores = [5.0] * group_size
-        other_scores = [5.0] * group_size
-        tasks = []
-        async with asyncio.TaskGroup() as tg:
-            for idx in range(1, group_size):
-                task = tg.create_task(
-                    self.llm_judge.bidirectional_compare(
-                        predictions[idx], pivot_prediction, query=query, idx=idx
-                    )
-                )
-                tasks.append(task)
+        session = self.open_session(len(predictions), query=query)
+        for idx, prediction in enumerate(predictions):
+            session.submit(idx, prediction)
 
-        for task in tasks:
-            other_score, pivot_score, metadata = task.result()
-            idx = metadata["idx"]
-            other_scores[idx] = other_score
-            pivot_scores[idx] = pivot_score
+        return await session.finalize()
+
+    def calculate_group_rewards(
+        self, other_scores: list[float], pivot_scores: list[float]
+    ) -> list[float]:
+        group_size = len(other_scores)
 
         pivot_scores = pivot_scores[1:]
         pivot_mean_score = np.mean(pivot_scores)
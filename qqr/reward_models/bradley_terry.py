@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import random
+
+import numpy as np
+import pandas as pd
+import torch
+
+from qqr import registers
+from qqr.schemas import GroupRewardModel, LLMJudge
+
+logger = logging.getLogger(__name__)
+
+
+def fit_bradley_terry(
+    wins: np.ndarray,
+    counts: np.ndarray,
+    prior: float = 0.1,
+    max_iter: int = 200,
+    tol: float = 1e-6,
+) -> np.ndarray:
+    """
+    Fits Bradley-Terry strengths with the MM algorithm (Hunter, 2004).
+
+    Args:
+        wins: (n, n) matrix of the (soft) wins of i over j.
+        counts: (n, n) symmetric matrix of the number of comparisons between i and j.
+        prior: Virtual comparisons won by each side of every compared pair, which keeps
+            the strengths finite when a trajectory wins or loses all its comparisons.
+        max_iter: Maximum number of MM iterations.
+        tol: Stops once the log strengths change by less than `tol`.
+
+    Returns:
+        The strengths, normalized to a geometric mean of 1.
+    """
+    group_size = wins.shape[0]
+    compared = counts > 0
+    wins = wins + prior * compared
+    counts = counts + 2 * prior * compared
+
+    total_wins = wins.sum(axis=1)
+    strengths = np.ones(group_size)
+    for _ in range(max_iter):
+        pair_strengths = strengths[:, None] + strengths[None, :]
+        denominators = (counts / pair_strengths).sum(axis=1)
+        new_strengths = np.where(
+            denominators > 0, total_wins / np.maximum(denominators, 1e-12), 1.0
+        )
+        new_strengths /= np.exp(np.log(new_strengths).mean())
+
+        converged = np.max(np.abs(np.log(new_strengths / strengths))) < tol
+        strengths = new_strengths
+        if converged:
+            break
+
+    return strengths
+
+
+@registers.reward_model("bradley_terry")
+class BradleyTerryGroupRewardModel(GroupRewardModel):
+    """
+    Ranks the group by Bradley-Terry strengths fitted on a sparse comparison graph.
+
+    Every trajectory is compared with `degree` others on a randomly relabeled circulant
+    graph, i.e. about n * degree / 2 bidirectional comparisons instead of n(n-1)/2 for
+    round robin. The judge scores are used as soft wins, score_i / (score_i + score_j).
+    An odd degree needs an even group size, and is lowered by one otherwise.
+    """
+
+    def __init__(self, llm_judge: LLMJudge, degree: int = 4):
+        """
+        Args:
+            degree: Comparisons per trajectory, at least 2 so that the graph is
+                connected, and lower than the group size.
+        """
+        if degree < 2:
+            raise ValueError(
+                f"The comparison graph degree must be at least 2, got {degree}."
+            )
+
+        super().__init__()
+
+        self.llm_judge = llm_judge
+        self.degree = degree
+        self.warned_group_sizes: set[int] = set()
+
+    async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
+        group_size = len(predictions)
+
+        wins = np.zeros((group_size, group_size))
+        counts = np.zeros((group_size, group_size))
+        pairs = self.create_comparison_graph(group_size)
+        tasks = []
+        async with asyncio.TaskGroup() as tg:
+            for i, j in pairs:
+                task = tg.create_task(
+                    self.llm_judge.bidirectional_compare(
+                        predictions[i], predictions[j], query=query, i=i, j=j
+                    )
+                )
+                tasks.append(task)
+
+        for task in tasks:
+            score_i, score_j, metadata = task.result()
+            i, j = metadata["i"], metadata["j"]
+            add_soft_win(wins, counts, i, j, score_i, score_j)
+
+        strengths = fit_bradley_terry(wins, counts)
+        return self.calculate_group_rewards(strengths.tolist())
+
+    def create_comparison_graph(self, group_size: int) -> list[tuple[int, int]]:
+        """Returns the edges of a connected k-regular graph (k = degree)."""
+        degree = self.degree
+        if degree >= group_size:
+            raise ValueError(
+                f"The comparison graph degree ({degree}) must be lower than the group "
+                f"size ({group_size}), use round_robin to compare every pair."
+            )
+        if degree % 2 == 1 and group_size % 2 == 1:
+            if group_size not in self.warned_group_sizes:
+                self.warned_group_sizes.add(group_size)
+                logger.warning(
+                    f"[BradleyTerry] An odd degree ({degree}) needs an even group size, "
+                    f"comparing with {degree - 1} others in groups of {group_size}."
+                )
+            degree -= 1
+
+        nodes = list(range(group_size))
+        random.shuffle(nodes)
+
+        offsets = list(range(1, degree // 2 + 1))
+        # An odd degree needs the diameters, which only exist for an even group size.
+        if degree % 2 == 1:
+            offsets.append(group_size // 2)
+
+        pairs = set()
+        for position in range(group_size):
+            for offset in offsets:
+                i = nodes[position]
+                j = nodes[(position + offset) % group_size]
+                pairs.add((min(i, j), max(i, j)))
+
+        assert is_connected(group_size, pairs), "Disconnected comparison graph."
+        return sorted(pairs)
+
+    def calculate_group_rewards(self, strengths: list[float]) -> list[float]:
+        group_size = len(strengths)
+
+        ranks = pd.Series(strengths).rank(method="min", ascending=False).tolist()
+        max_rank = max(ranks)
+
+        if max_rank == 1:
+            group_rewards = [0.0] * group_size
+        else:
+            group_rewards = [(max_rank - r) / (max_rank - 1) for r in ranks]
+
+        group_rewards = torch.tensor(group_rewards, dtype=torch.float)
+        mean = group_rewards.mean(dim=-1, keepdim=True)
+        std = group_rewards.std(dim=-1, keepdim=True)
+        group_rewards = (group_rewards - mean) / (std + 1e-6)
+        group_rewards = group_rewards.flatten().tolist()
+
+        return group_rewards
+
+
+def add_soft_win(
+    wins: np.ndarray,
+    counts: np.ndarray,
+    i: int,
+    j: int,
+    score_i: float,
+    score_j: float,
+) -> None:
+    """Records a comparison between i and j, won in proportion to their scores."""
+    total = score_i + score_j
+    win_i = score_i / total if total > 0 else 0.5
+
+    wins[i, j] += win_i
+    wins[j, i] += 1.0 - win_i
+    counts[i, j] += 1.0
+    counts[j, i] += 1.0
+
+
+def is_connected(num_nodes: int, edges: set[tuple[int, int]]) -> bool:
+    """Whether every node can be reached from the first one."""
+    neighbors: list[list[int]] = [[] for _ in range(num_nodes)]
+    for i, j in edges:
+        neighbors[i].append(j)
+        neighbors[j].append(i)
+
+    visited = {0}
+    stack = [0]
+    while stack:
+        for j in neighbors[stack.pop()]:
+            if j not in visited:
+                visited.add(j)
+                stack.append(j)
+    return len(visited) == num_nodes
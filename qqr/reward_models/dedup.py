@@ -0,0 +1,157 @@
+import hashlib
+import json
+
+import numpy as np
+import torch
+
+from qqr import registers
+from qqr.llm_judges import count_judge_requests
+from qqr.schemas import GroupRewardModel, LLMJudge
+from qqr.utils.metrics import metrics
+
+from .utils import get_reward_model
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+@registers.reward_model("dedup")
+class DedupGroupRewardModel(GroupRewardModel):
+    """
+    Collapses duplicate trajectories before running another topology.
+
+    Trajectories are compared as the judge sees them (`process_messages`): exact
+    duplicates by hash and, with `near_duplicate_threshold`, near duplicates by the
+    MinHash estimate of the Jaccard similarity of their character shingles. The topology
+    only judges the first trajectory of each cluster, whose reward is shared with the
+    other members, and the rewards are standardized again over the whole group.
+
+    The group is clustered once complete, so the topology does not start judging while
+    the group is still generating.
+    """
+
+    def __init__(
+        self,
+        llm_judge: LLMJudge,
+        reward_model: str = "anchor",
+        reward_model_kwargs: dict | None = None,
+        near_duplicate_threshold: float | None = None,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+    ):
+        """
+        Args:
+            reward_model: Name of the topology judging the representatives.
+            reward_model_kwargs: Extra arguments of the topology.
+            near_duplicate_threshold: Estimated Jaccard similarity from which two
+                trajectories are near duplicates. Only exact duplicates if None.
+            num_perm: Number of MinHash permutations.
+            shingle_size: Number of characters per shingle.
+        """
+        super().__init__()
+
+        self.llm_judge = llm_judge
+        self.reward_model = get_reward_model(reward_model)(
+            llm_judge, **(reward_model_kwargs or {})
+        )
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(0)
+        self.perm_a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.perm_b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
+        group_size = len(predictions)
+
+        clusters = self.cluster(predictions)
+        num_clusters = len(clusters)
+        metrics.observe("dedup/duplicates", group_size - num_clusters)
+
+        if num_clusters == 1:
+            return [0.0] * group_size
+
+        with count_judge_requests() as num_calls:
+            cluster_rewards = await self.reward_model.compute(
+                [predictions[cluster[0]] for cluster in clusters], query=query
+            )
+
+        # The duplicates are estimated to cost as many judge calls as the trajectories
+        # judged in their place.
+        metrics.observe("dedup/judge_calls", num_calls[0])
+        metrics.observe(
+            "dedup/saved_judge_calls",
+            num_calls[0] * (group_size - num_clusters) / num_clusters,
+        )
+
+        if num_clusters == group_size:
+            return cluster_rewards
+
+        group_rewards = [0.0] * group_size
+        for cluster, reward in zip(clusters, cluster_rewards, strict=True):
+            for idx in cluster:
+                group_rewards[idx] = reward
+
+        group_rewards = torch.tensor(group_rewards, dtype=torch.float)
+        mean = group_rewards.mean(dim=-1, keepdim=True)
+        std = group_rewards.std(dim=-1, keepdim=True)
+        group_rewards = (group_rewards - mean) / (std + 1e-6)
+        group_rewards = group_rewards.flatten().tolist()
+
+        return group_rewards
+
+    def cluster(self, predictions: list[list[dict]]) -> list[list[int]]:
+        """Returns the clusters of duplicates, in order of their first member."""
+        texts = [
+            json.dumps(
+                self.llm_judge.process_messages(prediction),
+                ensure_ascii=False,
+                sort_keys=True,
+                default=str,
+            )
+            for prediction in predictions
+        ]
+
+        clusters: list[list[int]] = []
+        cluster_by_hash: dict[str, int] = {}
+        signatures: list[np.ndarray] = []
+        for idx, text in enumerate(texts):
+            key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if key in cluster_by_hash:
+                clusters[cluster_by_hash[key]].append(idx)
+                continue
+
+            if self.near_duplicate_threshold is not None:
+                signature = self.minhash(text)
+                similarities = [np.mean(signature == s) for s in signatures]
+                if similarities and max(similarities) >= self.near_duplicate_threshold:
+                    cluster_idx = int(np.argmax(similarities))
+                    clusters[cluster_idx].append(idx)
+                    cluster_by_hash[key] = cluster_idx
+                    continue
+                signatures.append(signature)
+
+            cluster_by_hash[key] = len(clusters)
+            clusters.append([idx])
+
+        return clusters
+
+    def minhash(self, text: str) -> np.ndarray:
+        shingles = {
+            text[i : i + self.shingle_size]
+            for i in range(max(len(text) - self.shingle_size + 1, 1))
+        }
+        hashes = np.array(
+            [
+                int.from_bytes(
+                    hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little"
+                )
+                % MERSENNE_PRIME
+                for s in shingles
+            ],
+            dtype=np.uint64,
+        )
+
+        # (a * x + b) mod p, whose 31-bit operands cannot overflow 64 bits.
+        values = self.perm_a[:, None] * hashes[None, :] + self.perm_b[:, None]
+        values %= MERSENNE_PRIME
+        return values.min(axis=1)
@@ -1,6 +1,7 @@
 import asyncio
 import random
 import statistics
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 
 import torch
@@ -19,6 +20,18 @@ class Player:
         return statistics.mean(self.points) if self.points else 0.0
 
 
+async def iterate_drops(
+    wb_drops: list[list[Player]] | asyncio.Queue,
+) -> AsyncIterator[list[Player]]:
+    if not isinstance(wb_drops, asyncio.Queue):
+        for dropped_players in wb_drops:
+            yield dropped_players
+        return
+
+    while (dropped_players := await wb_drops.get()) is not None:
+        yield dropped_players
+
+
 @registers.reward_model("double_elimination")
 class DoubleEliminationGroupRewardModel(GroupRewardModel):
     def __init__(self, llm_judge: LLMJudge):
@@ -31,12 +44,20 @@ class DoubleEliminationGroupRewardModel(GroupRewardModel):
 
         players = [Player(idx=i) for i in range(group_size)]
 
-        wb_champion, wb_drops_schedule = await self.run_winners_bracket(
-            players, predictions, query=query
-        )
-        lb_champion, lb_eliminated_history = await self.run_losers_bracket(
-            wb_drops_schedule, predictions, query=query
-        )
+        # The losers bracket plays each round as soon as the winners bracket drops its
+        # losers, instead of waiting for the whole winners bracket.
+        wb_drops: asyncio.Queue[list[Player] | None] = asyncio.Queue()
+        async with asyncio.TaskGroup() as tg:
+            wb_task = tg.create_task(
+                self.run_winners_bracket(
+                    players, predictions, query=query, drops_queue=wb_drops
+                )
+            )
+            lb_task = tg.create_task(
+                self.run_losers_bracket(wb_drops, predictions, query=query)
+            )
+        wb_champion, _ = wb_task.result()
+        lb_champion, lb_eliminated_history = lb_task.result()
         grand_winner, grand_loser = await self.run_grand_final(
             wb_champion, lb_champion, predictions, query=query
         )
@@ -85,8 +106,17 @@ class DoubleEliminationGroupRewardModel(GroupRewardModel):
         return winners, losers
 
     async def run_winners_bracket(
-        self, players: list[Player], predictions: list[list[dict]], query: str
+        self,
+        players: list[Player],
+        predictions: list[list[dict]],
+        query: str,
+        drops_queue: asyncio.Queue | None = None,
     ) -> tuple[Player, list[list[Player]]]:
+        """
+        Args:
+            drops_queue: Receives the losers of every round as soon as it is played,
+                followed by None once the bracket is over.
+        """
         active_players: list[Player] = players[:]
         drops_schedule: list[list[Player]] = []
 
@@ -97,17 +127,30 @@ class DoubleEliminationGroupRewardModel(GroupRewardModel):
             active_players = winners
             if losers:
                 drops_schedule.append(losers)
+                if drops_queue is not None:
+                    drops_queue.put_nowait(losers)
+
+        if drops_queue is not None:
+            drops_queue.put_nowait(None)
 
         wb_champion = active_players[0] if active_players else None
         return wb_champion, drops_schedule
 
     async def run_losers_bracket(
-        self, wb_drops: list[list[Player]], predictions: list[list[dict]], query: str
+        self,
+        wb_drops: list[list[Player]] | asyncio.Queue,
+        predictions: list[list[dict]],
+        query: str,
     ) -> tuple[Player | None, list[list[Player]]]:
+        """
+        Args:
+            wb_drops: The losers of every winners bracket round, or a queue receiving
+                them as they are dropped, terminated by None.
+        """
         active_players: list[Player] = []
         eliminated_history: list[list[Player]] = []
 
-        for dropped_players in wb_drops:
+        async for dropped_players in iterate_drops(wb_drops):
             active_players.extend(dropped_players)
 
             if len(active_players) >= 2:
@@ -0,0 +1,144 @@
+import asyncio
+
+import numpy as np
+
+from qqr import registers
+from qqr.schemas import LLMJudge
+from qqr.utils.metrics import metrics
+
+from .bradley_terry import BradleyTerryGroupRewardModel, add_soft_win, fit_bradley_terry
+
+
+@registers.reward_model("dueling_bandit")
+class DuelingBanditGroupRewardModel(BradleyTerryGroupRewardModel):
+    """
+    Active ranking that spends the comparisons where the ranks are uncertain.
+
+    After a sparse warm-up graph, the Bradley-Terry strengths are refitted after every
+    batch, with a Laplace approximation of their posterior variance. The next batch
+    takes the pairs not compared yet whose outcome is the most uncertain, among those
+    whose strengths overlap. It stops once neighbors in the ranking are separated, no
+    informative pair is left, or the budget of comparisons is spent.
+    """
+
+    def __init__(
+        self,
+        llm_judge: LLMJudge,
+        degree: int = 2,
+        batch_size: int = 8,
+        max_comparisons: int | None = None,
+        confidence: float = 1.0,
+    ):
+        """
+        Args:
+            degree: Degree of the warm-up comparison graph.
+            batch_size: Number of comparisons dispatched in parallel per round.
+            max_comparisons: Budget of bidirectional comparisons per group, 3 * n by
+                default (each comparison is 2 judge calls).
+            confidence: Number of standard deviations separating two strengths for their
+                order to be considered confident.
+        """
+        super().__init__(llm_judge, degree=degree)
+
+        self.batch_size = batch_size
+        self.max_comparisons = max_comparisons
+        self.confidence = confidence
+
+    async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
+        group_size = len(predictions)
+        max_comparisons = self.max_comparisons or 3 * group_size
+
+        wins = np.zeros((group_size, group_size))
+        counts = np.zeros((group_size, group_size))
+
+        pairs = self.create_comparison_graph(group_size)[:max_comparisons]
+        num_comparisons = 0
+        num_rounds = 0
+        while pairs:
+            tasks = []
+            async with asyncio.TaskGroup() as tg:
+                for i, j in pairs:
+                    task = tg.create_task(
+                        self.llm_judge.bidirectional_compare(
+                            predictions[i], predictions[j], query=query, i=i, j=j
+                        )
+                    )
+                    tasks.append(task)
+
+            for task in tasks:
+                score_i, score_j, metadata = task.result()
+                add_soft_win(
+                    wins, counts, metadata["i"], metadata["j"], score_i, score_j
+                )
+
+            num_comparisons += len(pairs)
+            num_rounds += 1
+            batch_size = min(self.batch_size, max_comparisons - num_comparisons)
+            pairs = self.select_pairs(wins, counts, batch_size)
+
+        metrics.observe("dueling_bandit/comparisons", num_comparisons)
+        metrics.observe("dueling_bandit/rounds", num_rounds)
+
+        strengths = fit_bradley_terry(wins, counts)
+        return self.calculate_group_rewards(strengths.tolist())
+
+    def select_pairs(
+        self, wins: np.ndarray, counts: np.ndarray, batch_size: int
+    ) -> list[tuple[int, int]]:
+        """Returns the next pairs to compare, or none once the ranking is confident."""
+        if batch_size <= 0:
+            return []
+
+        thetas, variances = self.fit_posterior(wins, counts)
+        margins = np.abs(thetas[:, None] - thetas[None, :])
+        stds = np.sqrt(variances[:, None] + variances[None, :])
+        overlapping = margins < self.confidence * stds
+
+        order = np.argsort(-thetas)
+        if not overlapping[order[:-1], order[1:]].any():
+            return []
+
+        # Expected information of a comparison: outcome variance times strength variance.
+        probs = 1.0 / (1.0 + np.exp(-(thetas[:, None] - thetas[None, :])))
+        gains = probs * (1.0 - probs) * stds**2
+        candidates = np.triu(overlapping & (counts == 0), k=1)
+        gains = np.where(candidates, gains, -np.inf)
+
+        # Prefer batches where every trajectory is compared at most once.
+        pairs, selected, used = [], set(), set()
+        ranked = np.argsort(-gains, axis=None)
+        for flat_idx in ranked[: int(candidates.sum())]:
+            i, j = divmod(int(flat_idx), len(thetas))
+            if i not in used and j not in used:
+                pairs.append((i, j))
+                selected.add((i, j))
+                used.update((i, j))
+            if len(pairs) == batch_size:
+                return pairs
+
+        for flat_idx in ranked[: int(candidates.sum())]:
+            i, j = divmod(int(flat_idx), len(thetas))
+            if (i, j) not in selected:
+                pairs.append((i, j))
+            if len(pairs) == batch_size:
+                break
+
+        return pairs
+
+    def fit_posterior(
+        self, wins: np.ndarray, counts: np.ndarray, prior: float = 0.1
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the log strengths and their variances, from the diagonal of the Fisher
+        information at the fitted strengths (Laplace approximation).
+        """
+        thetas = np.log(fit_bradley_terry(wins, counts, prior=prior))
+
+        probs = 1.0 / (1.0 + np.exp(-(thetas[:, None] - thetas[None, :])))
+        compared = counts > 0
+        information = ((counts + 2 * prior * compared) * probs * (1.0 - probs)).sum(
+            axis=1
+        )
+        variances = 1.0 / (information + prior)
+
+        return thetas, variances
@@ -0,0 +1,156 @@
+import asyncio
+
+import torch
+
+from qqr import registers
+from qqr.schemas import GroupRewardModel, LLMJudge
+from qqr.utils.metrics import metrics
+
+
+@registers.reward_model("merge_sort")
+class MergeSortGroupRewardModel(GroupRewardModel):
+    """
+    Full ordering of the group by merge sort, using the judge as comparator.
+
+    Both halves are sorted concurrently, and runs are merged by divide and conquer: the
+    middle element of the longer run is placed in the shorter one by binary search, and
+    both sides are merged concurrently. This takes O(n log n) comparisons with a critical
+    path of O(log^3 n) comparisons. Ties keep the earlier run first.
+    """
+
+    def __init__(self, llm_judge: LLMJudge):
+        super().__init__()
+
+        self.llm_judge = llm_judge
+
+    async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
+        group_size = len(predictions)
+        stats = {"comparisons": 0}
+
+        ranked_indices, depth = await self.sort(
+            list(range(group_size)), predictions, query=query, depth=0, stats=stats
+        )
+
+        metrics.observe("merge_sort/comparisons", stats["comparisons"])
+        metrics.observe("merge_sort/depth", depth)
+
+        return self.calculate_group_rewards(ranked_indices, group_size)
+
+    async def sort(
+        self,
+        indices: list[int],
+        predictions: list[list[dict]],
+        query: str,
+        depth: int,
+        stats: dict[str, int],
+    ) -> tuple[list[int], int]:
+        """Returns the indices from best to worst, and the depth of the last comparison."""
+        if len(indices) <= 1:
+            return indices, depth
+
+        mid = len(indices) // 2
+        async with asyncio.TaskGroup() as tg:
+            left_task = tg.create_task(
+                self.sort(indices[:mid], predictions, query, depth, stats)
+            )
+            right_task = tg.create_task(
+                self.sort(indices[mid:], predictions, query, depth, stats)
+            )
+        left, left_depth = left_task.result()
+        right, right_depth = right_task.result()
+
+        return await self.merge(
+            left, right, predictions, query, max(left_depth, right_depth), stats
+        )
+
+    async def merge(
+        self,
+        left: list[int],
+        right: list[int],
+        predictions: list[list[dict]],
+        query: str,
+        depth: int,
+        stats: dict[str, int],
+    ) -> tuple[list[int], int]:
+        if not left or not right:
+            return left + right, depth
+
+        # Split the longer run at its middle, and find where it goes in the other one.
+        if len(left) >= len(right):
+            mid = len(left) // 2
+            pivot = left[mid]
+            # Elements of the right run only go before the pivot if strictly better.
+            position, depth = await self.bisect(
+                right, pivot, predictions, query, depth, stats, pivot_first=True
+            )
+            parts = (left[:mid], right[:position]), (left[mid + 1 :], right[position:])
+        else:
+            mid = len(right) // 2
+            pivot = right[mid]
+            position, depth = await self.bisect(
+                left, pivot, predictions, query, depth, stats, pivot_first=False
+            )
+            parts = (left[:position], right[:mid]), (left[position:], right[mid + 1 :])
+
+        async with asyncio.TaskGroup() as tg:
+            before_task = tg.create_task(
+                self.merge(*parts[0], predictions, query, depth, stats)
+            )
+            after_task = tg.create_task(
+                self.merge(*parts[1], predictions, query, depth, stats)
+            )
+        before, before_depth = before_task.result()
+        after, after_depth = after_task.result()
+
+        return before + [pivot] + after, max(before_depth, after_depth)
+
+    async def bisect(
+        self,
+        run: list[int],
+        pivot: int,
+        predictions: list[list[dict]],
+        query: str,
+        depth: int,
+        stats: dict[str, int],
+        pivot_first: bool,
+    ) -> tuple[int, int]:
+        """
+        Returns the number of elements of the sorted run ranked before the pivot.
+
+        Args:
+            pivot_first: Whether the pivot wins ties, i.e. comes from the earlier run.
+        """
+        low, high = 0, len(run)
+        while low < high:
+            mid = (low + high) // 2
+            score_run, score_pivot, _ = await self.llm_judge.bidirectional_compare(
+                predictions[run[mid]], predictions[pivot], query=query
+            )
+            stats["comparisons"] += 1
+            depth += 1
+
+            if score_run > score_pivot or (
+                score_run == score_pivot and not pivot_first
+            ):
+                low = mid + 1
+            else:
+                high = mid
+
+        return low, depth
+
+    def calculate_group_rewards(
+        self, ranked_indices: list[int], group_size: int
+    ) -> list[float]:
+        group_rewards = [0.0] * group_size
+
+        for rank_idx, idx in enumerate(ranked_indices):
+            reward = 1.0 - (rank_idx / (group_size - 1))
+            group_rewards[idx] = reward
+
+        group_rewards = torch.tensor(group_rewards, dtype=torch.float)
+        mean = group_rewards.mean(dim=-1, keepdim=True)
+        std = group_rewards.std(dim=-1, keepdim=True)
+        group_rewards = (group_rewards - mean) / (std + 1e-6)
+        group_rewards = group_rewards.flatten().tolist()
+
+        return group_rewards
@@ -7,6 +7,8 @@ import torch
 from qqr import registers
 from qqr.schemas import GroupRewardModel, LLMJudge
 
+from .anchor import AnchorSession
+
 
 @dataclass
 class Player:
@@ -18,6 +20,27 @@ class Player:
         return statistics.mean(self.points) if self.points else 0.0
 
 
+@dataclass
+class Match:
+    round_idx: int
+    match_idx: int
+    left: "Match | Player"
+    right: "Match | Player"
+
+
+class SingleEliminationSession(AnchorSession):
+    """Runs the seeding comparisons against the pivot as the predictions arrive."""
+
+    async def compute(self) -> list[float]:
+        players = [Player(idx=i) for i in range(self.group_size)]
+
+        if self.group_size >= 2:
+            other_scores, pivot_scores = await self.get_anchor_scores()
+            self.reward_model.apply_seeding_scores(players, other_scores, pivot_scores)
+
+        return await self.reward_model.run(players, self.predictions, query=self.query)
+
+
 @registers.reward_model("single_elimination")
 class SingleEliminationGroupRewardModel(GroupRewardModel):
     def __init__(self, llm_judge: LLMJudge):
@@ -25,12 +48,20 @@ class SingleEliminationGroupRewardModel(GroupRewardModel):
 
         self.llm_judge = llm_judge
 
+    def open_session(self, group_size: int, query: str) -> SingleEliminationSession:
+        return SingleEliminationSession(self, group_size, query=query)
+
     async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
-        group_size = len(predictions)
+        session = self.open_session(len(predictions), query=query)
+        for idx, prediction in enumerate(predictions):
+            session.submit(idx, prediction)
 
-        players = [Player(idx=i) for i in range(group_size)]
+        return await session.finalize()
 
-        await self.compute_seeding_scores(players, predictions, query=query)
+    async def run(
+        self, players: list[Player], predictions: list[list[dict]], query: str
+    ) -> list[float]:
+        group_size = len(players)
 
         bracket = self.get_seeded_bracket(players)
         champion, eliminated_history = await self.run_tournament(
@@ -41,97 +72,82 @@ class SingleEliminationGroupRewardModel(GroupRewardModel):
         group_rewards = self.calculate_group_rewards(ranked_players, group_size)
         return group_rewards
 
-    async def compute_seeding_scores(
-        self, players: list[Player], predictions: list[list[dict]], query: str
+    def apply_seeding_scores(
+        self,
+        players: list[Player],
+        other_scores: list[float],
+        pivot_scores: list[float],
     ):
-        """Runs a quick Anchor comparison (everyone vs Index 0) to establish an initial seeding score (avg_point)."""
-        group_size = len(players)
-        if group_size < 2:
-            return
-
+        """Sets the initial seeding score (avg_point) from an Anchor comparison (everyone vs Index 0)."""
         pivot_idx = 0
-        pivot_prediction = predictions[pivot_idx]
-        pivot_scores = []
-
-        tasks = []
-        async with asyncio.TaskGroup() as tg:
-            for idx in range(1, group_size):
-                task = tg.create_task(
-                    self.llm_judge.bidirectional_compare(
-                        predictions[idx], pivot_prediction, query=query, idx=idx
-                    )
-                )
-                tasks.append(task)
-
-        for task in tasks:
-            score_other, score_pivot, metadata = task.result()
-            idx = metadata["idx"]
-            players[idx].points.append(score_other)
-            pivot_scores.append(score_pivot)
-
-        players[pivot_idx].points.append(statistics.mean(pivot_scores))
+        for idx in range(1, len(players)):
+            players[idx].points.append(other_scores[idx])
+
+        players[pivot_idx].points.append(statistics.mean(pivot_scores[1:]))
 
     async def run_tournament(
         self, bracket: list[Player], predictions: list[list[dict]], query: str
     ) -> tuple[Player | None, list[list[Player]]]:
-        active_players = bracket[:]
-        eliminated_history: list[list[Player]] = []
-
-        while len(active_players) > 1:
-            next_round_players = []
-            round_losers = []
-
-            # Create pairings based on current bracket order
-            pairings = []
-            i = 0
-            while i < len(active_players):
-                if i + 1 < len(active_players):
-                    pairings.append((active_players[i], active_players[i + 1]))
-                    i += 2
-                else:
-                    # Bye: Player advances automatically
-                    next_round_players.append(active_players[i])
-                    i += 1
-
-            # Run comparisons
-            tasks = []
+        """
+        Plays every match as soon as both of its participants are known, instead of
+        round by round, so that a slow comparison only delays the matches depending on it.
+        """
+        root, num_matches_per_round = self.build_bracket_tree(bracket)
+        losers: dict[tuple[int, int], Player] = {}
+
+        async def play(node: Match | Player) -> Player:
+            if isinstance(node, Player):
+                return node
+
             async with asyncio.TaskGroup() as tg:
-                for p1, p2 in pairings:
-                    tasks.append(
-                        tg.create_task(
-                            self.llm_judge.bidirectional_compare(
-                                predictions[p1.idx],
-                                predictions[p2.idx],
-                                query=query,
-                                p1=p1,
-                                p2=p2,
-                            )
-                        )
-                    )
-
-            # Process results
-            for task in tasks:
-                score_1, score_2, metadata = task.result()
-                p1, p2 = metadata["p1"], metadata["p2"]
-
-                p1.points.append(score_1)
-                p2.points.append(score_2)
-
-                if score_1 >= score_2:
-                    next_round_players.append(p1)
-                    round_losers.append(p2)
-                else:
-                    next_round_players.append(p2)
-                    round_losers.append(p1)
-
-            if round_losers:
-                eliminated_history.append(round_losers)
-
-            active_players = next_round_players
-
-        champion = active_players[0] if active_players else None
+                task_1 = tg.create_task(play(node.left))
+                task_2 = tg.create_task(play(node.right))
+            p1, p2 = task_1.result(), task_2.result()
+
+            score_1, score_2, _ = await self.llm_judge.bidirectional_compare(
+                predictions[p1.idx], predictions[p2.idx], query=query, p1=p1, p2=p2
+            )
+            p1.points.append(score_1)
+            p2.points.append(score_2)
+
+            winner, loser = (p1, p2) if score_1 >= score_2 else (p2, p1)
+            losers[(node.round_idx, node.match_idx)] = loser
+            return winner
+
+        champion = await play(root) if root is not None else None
+
+        eliminated_history = [
+            [losers[(round_idx, match_idx)] for match_idx in range(num_matches)]
+            for round_idx, num_matches in enumerate(num_matches_per_round)
+        ]
         return champion, eliminated_history
 
+    def build_bracket_tree(
+        self, bracket: list[Player]
+    ) -> tuple[Match | Player | None, list[int]]:
+        """
+        Lays out the matches of the bracket, which do not depend on their results.
+
+        Players are paired in bracket order in every round, and the odd one out gets a
+        bye to the front of the next round.
+        """
+        entries: list[Match | Player] = bracket[:]
+        num_matches_per_round = []
+
+        while len(entries) > 1:
+            round_idx = len(num_matches_per_round)
+            matches = [
+                Match(round_idx, match_idx, entries[i], entries[i + 1])
+                for match_idx, i in enumerate(range(0, len(entries) - 1, 2))
+            ]
+            byes = entries[-1:] if len(entries) % 2 else []
+
+            num_matches_per_round.append(len(matches))
+            entries = byes + matches
+
+        root = entries[0] if entries else None
+        return root, num_matches_per_round
+
     def get_seeded_bracket(self, players: list[Player]) -> list[Player]:
         """Arranges players so high seeds don't meet early."""
         group_size = len(players)
@@ -1,4 +1,5 @@
 import asyncio
+import itertools
 import math
 import random
 from dataclasses import dataclass, field
@@ -7,6 +8,7 @@ import torch
 
 from qqr import registers
 from qqr.schemas import GroupRewardModel, LLMJudge
+from qqr.utils.metrics import metrics
 
 
 @dataclass
@@ -15,23 +17,48 @@ class Player:
     points: float = 0.0
     opponents: set[int] = field(default_factory=set)
     buchholz: float = 0.0
+    had_bye: bool = False
 
 
 @registers.reward_model("swiss")
 class SwissSystemGroupRewardModel(GroupRewardModel):
-    def __init__(self, llm_judge: LLMJudge, max_num_rounds: int | None = None):
+    def __init__(
+        self,
+        llm_judge: LLMJudge,
+        max_num_rounds: int | None = None,
+        adaptive: bool = False,
+    ):
+        """
+        Args:
+            max_num_rounds: Number of rounds, ceil(log2(n)) by default.
+            adaptive: Only pair the players whose standing can still change with the
+                points left to play, and stop once every standing is settled.
+        """
         super().__init__()
 
         self.llm_judge = llm_judge
         self.max_num_rounds = max_num_rounds
+        self.adaptive = adaptive
 
     async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
         group_size = len(predictions)
 
         num_rounds = self.get_num_rounds(group_size)
         players = [Player(idx=i) for i in range(group_size)]
-        for _ in range(num_rounds):
-            pairings, bye_player_idx = self.create_pairings(players)
+        num_played_rounds = 0
+        num_comparisons = 0
+        for round_idx in range(num_rounds):
+            active_players = players
+            if self.adaptive:
+                active_players = self.get_unsettled_players(
+                    players, num_rounds - round_idx
+                )
+                if not active_players:
+                    break
+
+            pairings, bye_player_idx = self.create_pairings(active_players)
+            num_played_rounds += 1
+            num_comparisons += len(pairings)
 
             tasks = []
             async with asyncio.TaskGroup() as tg:
@@ -59,6 +86,15 @@ class SwissSystemGroupRewardModel(GroupRewardModel):
 
             if bye_player_idx is not None:
                 players[bye_player_idx].points += 1.0
+                players[bye_player_idx].had_bye = True
+
+        if self.adaptive:
+            metrics.observe("swiss/rounds", num_played_rounds)
+            metrics.observe("swiss/saved_rounds", num_rounds - num_played_rounds)
+            metrics.observe(
+                "swiss/saved_comparisons",
+                num_rounds * (group_size // 2) - num_comparisons,
+            )
 
         self.calculate_buchholz(players)
         group_rewards = self.calculate_group_rewards(players, group_size)
@@ -74,42 +110,90 @@ class SwissSystemGroupRewardModel(GroupRewardModel):
         num_rounds = min(num_rounds, group_size - 1)
         return num_rounds
 
+    def get_unsettled_players(
+        self, players: list[Player], num_remaining_rounds: int
+    ) -> list[Player]:
+        """
+        Returns the players whose standing can still change.
+
+        A player is settled once the points gap to both neighbors in the standings
+        exceeds the points left to play, and settled players sit out the next rounds.
+        """
+        ranked_players = sorted(players, key=lambda p: p.points, reverse=True)
+
+        unsettled = set()
+        for p1, p2 in itertools.pairwise(ranked_players):
+            if p1.points - p2.points <= num_remaining_rounds:
+                unsettled.update((p1.idx, p2.idx))
+
+        return [p for p in players if p.idx in unsettled]
+
     def create_pairings(self, players: list[Player]) -> tuple[list, int | None]:
-        random.shuffle(players)
-        players_sorted = sorted(players, key=lambda p: p.points, reverse=True)
+        # Random order within the same points.
+        unpaired = players[:]
+        random.shuffle(unpaired)
+        unpaired.sort(key=lambda p: p.points, reverse=True)
 
-        unpaired = players_sorted[:]
-        pairings = []
         bye_player_idx = None
-
         if len(unpaired) % 2 != 0:
-            bye_player_idx = unpaired.pop(-1).idx
-
-        processed = [False] * len(unpaired)
-        for i in range(len(unpaired)):
-            if processed[i]:
-                continue
-
-            p1 = unpaired[i]
-            found_opponent = False
-            for j in range(i + 1, len(unpaired)):
-                if not processed[j] and unpaired[j].idx not in p1.opponents:
-                    p2 = unpaired[j]
-                    pairings.append((p1.idx, p2.idx))
-                    processed[i] = processed[j] = True
-                    found_opponent = True
-                    break
+            # The lowest ranked player without a bye yet.
+            bye_player = next(
+                (p for p in reversed(unpaired) if not p.had_bye), unpaired[-1]
+            )
+            unpaired.remove(bye_player)
+            bye_player_idx = bye_player.idx
 
-            if not found_opponent:
-                for j in range(i + 1, len(unpaired)):
-                    if not processed[j]:
-                        p2 = unpaired[j]
-                        pairings.append((p1.idx, p2.idx))
-                        processed[i] = processed[j] = True
-                        break
+        pairings = self.pair_without_rematches(unpaired)
+        if pairings is None:
+            # Rematches are unavoidable (or too costly to avoid), pair neighbors.
+            pairings = [
+                (unpaired[i].idx, unpaired[i + 1].idx)
+                for i in range(0, len(unpaired), 2)
+            ]
 
         return pairings, bye_player_idx
 
+    def pair_without_rematches(
+        self, players: list[Player], max_steps: int = 10000
+    ) -> list[tuple[int, int]] | None:
+        """
+        Pairs the ranked players without rematches, each with the closest available
+        opponent, backtracking when the rest cannot be paired.
+
+        Returns None if there is no such pairing, or none found within `max_steps`.
+        """
+        paired = [False] * len(players)
+        pairings = []
+        num_steps = 0
+
+        def search(start: int) -> bool:
+            nonlocal num_steps
+
+            i = next((k for k in range(start, len(players)) if not paired[k]), None)
+            if i is None:
+                return True
+
+            paired[i] = True
+            for j in range(i + 1, len(players)):
+                if paired[j] or players[j].idx in players[i].opponents:
+                    continue
+
+                num_steps += 1
+                if num_steps > max_steps:
+                    break
+
+                paired[j] = True
+                pairings.append((players[i].idx, players[j].idx))
+                if search(i + 1):
+                    return True
+                pairings.pop()
+                paired[j] = False
+
+            paired[i] = False
+            return False
+
+        return pairings if search(0) else None
+
     def calculate_buchholz(self, players: list[Player]):
         for p in players:
             p.buchholz = sum(players[opp_idx].points for opp_idx in p.opponents)
@@ -1,14 +1,18 @@
 import asyncio
+import contextvars
 import copy
 import inspect
 import json
 import logging
+import math
+import time
 from argparse import Namespace
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable, Hashable
 from contextlib import contextmanager
 from copy import deepcopy
 from typing import Any
 
+import httpx
 import numpy as np
 import pybase64
 import sglang_router
@@ -30,12 +34,27 @@ from tqdm.auto import tqdm
 
 from qqr.mcp import MCPServer
 from qqr.mcp.utils import get_mcp_tools
+from qqr.rollout.session_router import SessionRouter
 from qqr.schemas import Sample
+from qqr.utils.envs import STREAM_READ_TIMEOUT
+from qqr.utils.metrics import eval_metrics, metrics
 
 __all__ = ["generate_rollout"]
 
 logger = logging.getLogger(__name__)
 
+for _metrics in (metrics, eval_metrics):
+    _metrics.register_ratio(
+        "prefix_cache/hit_rate",
+        "prefix_cache/cached_tokens",
+        "prefix_cache/prompt_tokens",
+    )
+
+# Whether the current task generates for evaluation, inherited by the tasks it creates.
+evaluating: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "evaluating", default=False
+)
+
 
 class GenerateState(metaclass=SingletonMeta):
     """
@@ -76,6 +95,19 @@ class GenerateState(metaclass=SingletonMeta):
         self.dp_counts = [0] * (args.sglang_dp_size or 1)
         self.dp_rank = 0
 
+        # sticky routing of multi-turn sessions
+        self.session_router = SessionRouter(
+            max_inflight_per_rank=math.ceil(
+                args.sglang_server_concurrency / (args.sglang_dp_size or 1)
+            )
+        )
+
+        # lazily created, since the client is bound to the event loop of its first use
+        self.stream_client: httpx.AsyncClient | None = None
+
+        # incremental group reward, see `generate_and_rm_group`
+        self.open_group_reward_session = load_group_reward_session_fn(args)
+
         self.reset()
 
     @contextmanager
@@ -96,6 +128,7 @@ class GenerateState(metaclass=SingletonMeta):
         self.remaining_batch_size = 0
         self.pendings = set()
         self.aborted = False
+        self.session_router.reset()
 
     def submit_generate_tasks(self, samples: list[list[Sample]]) -> None:
         for group in samples:
@@ -113,6 +146,24 @@ class GenerateState(metaclass=SingletonMeta):
         self.remaining_batch_size += len(samples)
 
 
+def load_group_reward_session_fn(args: Namespace) -> Callable | None:
+    """
+    Loads `open_group_reward_session(args, group)` from the module of the custom group
+    reward function, if it defines one.
+
+    The returned session receives the samples of the group as they finish with
+    `submit(idx, sample)`, and assigns the rewards in `finalize()`.
+    """
+    if not args.group_rm or args.custom_rm_path is None:
+        return None
+
+    module_path = args.custom_rm_path.rsplit(".", 1)[0]
+    try:
+        return load_function(f"{module_path}.open_group_reward_session")
+    except (ImportError, AttributeError):
+        return None
+
+
 class MCPState(metaclass=SingletonMeta):
     """
     The global state for the MCP server.
@@ -201,10 +252,83 @@ class MCPState(metaclass=SingletonMeta):
         }
 
 
+async def get_worker_urls(args: Namespace) -> list[str]:
+    if parse(sglang_router.__version__) <= parse("0.2.1") or args.use_slime_router:
+        response = await get(
+            f"http://{args.sglang_router_ip}:{args.sglang_router_port}/list_workers"
+        )
+        urls = response["urls"]
+    else:
+        response = await get(
+            f"http://{args.sglang_router_ip}:{args.sglang_router_port}/workers"
+        )
+        urls = [worker["url"] for worker in response["workers"]]
+
+    return urls
+
+
+async def post_stream(
+    client: httpx.AsyncClient, url: str, payload: dict
+) -> AsyncIterator[dict]:
+    """
+    Posts a streaming request to SGLang and yields the server-sent chunks.
+
+    Each chunk holds the cumulative output so far, so the last one is the full output.
+    """
+    async with client.stream("POST", url, json={**payload, "stream": True}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+            yield json.loads(data)
+
+
+async def post_generate(
+    args: Namespace,
+    url: str,
+    payload: dict,
+    on_text: Callable[[str], None] | None = None,
+) -> dict:
+    if on_text is None:
+        return await post(url, payload)
+
+    state = GenerateState(args)
+    if state.stream_client is None:
+        # Only bound the wait between chunks, the whole generation may take long.
+        state.stream_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(None, read=STREAM_READ_TIMEOUT)
+        )
+
+    output = None
+    async for output in post_stream(state.stream_client, url, payload):
+        on_text(output["text"])
+
+    assert output is not None, "Got an empty stream."
+    return output
+
+
 async def generate(
-    args: Namespace, sample: Sample, sampling_params: dict[str, Any]
+    args: Namespace,
+    sample: Sample,
+    sampling_params: dict[str, Any],
+    prompt_ids: list[int] | None = None,
+    session_id: Hashable | None = None,
+    on_text: Callable[[str], None] | None = None,
 ) -> Sample:
-    """Generate using traditional SGLang router with token-based workflow"""
+    """Generate using traditional SGLang router with token-based workflow
+
+    Args:
+        prompt_ids: Pre-tokenized prompt, e.g. from a `TrajectoryTokenBuffer`.
+            If not given, `sample.messages` is rendered with the chat template.
+        session_id: Key of the multi-turn session (e.g. a trajectory or a group).
+            Requests of the same session are sent directly to the same engine and
+            DP rank instead of through the router, so that they reuse its KV cache.
+        on_text: Callback receiving the response text decoded so far. If given, the
+            response is streamed and the callback is called on every chunk.
+    """
     state = GenerateState(args)
     url = f"http://{args.sglang_router_ip}:{args.sglang_router_port}/generate"
 
@@ -212,21 +336,27 @@ async def generate(
         sample.status == Sample.Status.PENDING or sample.status == Sample.Status.ABORTED
     ), f"Sample status is {sample.status}"
 
-    tools = sample.train_metadata.get("tools") if sample.train_metadata else None
-    prompt_text = state.tokenizer.apply_chat_template(
-        sample.messages, tools=tools, tokenize=False, add_generation_prompt=True
-    )
+    if prompt_ids is None:
+        tools = sample.train_metadata.get("tools") if sample.train_metadata else None
+        prompt_text = state.tokenizer.apply_chat_template(
+            list(sample.messages),
+            tools=tools,
+            tokenize=False,
+            add_generation_prompt=True,
+        )
 
-    if state.processor:
-        processor_output = state.processor(text=prompt_text, **sample.multimodal_inputs)
-        prompt_ids = processor_output["input_ids"][0]
-        sample.multimodal_train_inputs = {
-            k: v
-            for k, v in processor_output.items()
-            if k not in ["input_ids", "attention_mask"]
-        } or None
-    else:
-        prompt_ids = state.tokenizer.encode(prompt_text, add_special_tokens=False)
+        if state.processor:
+            processor_output = state.processor(
+                text=prompt_text, **sample.multimodal_inputs
+            )
+            prompt_ids = processor_output["input_ids"][0]
+            sample.multimodal_train_inputs = {
+                k: v
+                for k, v in processor_output.items()
+                if k not in ["input_ids", "attention_mask"]
+            } or None
+        else:
+            prompt_ids = state.tokenizer.encode(prompt_text, add_special_tokens=False)
 
     current_sampling_params = deepcopy(sampling_params)
     current_sampling_params["max_new_tokens"] = min(
@@ -272,7 +402,19 @@ async def generate(
         if not sample.tokens:  # Initialize sample.tokens for the first turn
             sample.tokens = prompt_ids
 
-    output = await post(url, payload)
+    if session_id is not None and not args.use_slime_router:
+        if not state.session_router.ready:
+            state.session_router.set_workers(
+                await get_worker_urls(args), args.sglang_dp_size or 1
+            )
+        with state.session_router.route(session_id) as (worker_url, dp_rank):
+            if args.sglang_dp_size and args.sglang_dp_size > 1:
+                payload["data_parallel_rank"] = dp_rank
+            output = await post_generate(
+                args, f"{worker_url}/generate", payload, on_text
+            )
+    else:
+        output = await post_generate(args, url, payload, on_text)
 
     if (
         args.use_slime_router
@@ -320,6 +462,16 @@ async def generate(
 
     sample.update_from_meta_info(args, output["meta_info"])
 
+    # Prefill savings from the engine's radix cache.
+    meta_info = output["meta_info"]
+    generate_metrics = eval_metrics if evaluating.get() else metrics
+    generate_metrics.inc(
+        "prefix_cache/prompt_tokens", meta_info.get("prompt_tokens", 0)
+    )
+    generate_metrics.inc(
+        "prefix_cache/cached_tokens", meta_info.get("cached_tokens", 0)
+    )
+
     return sample
 
 
@@ -411,6 +563,20 @@ async def generate_and_rm_group(
     if state.aborted:
         return group
 
+    # for the rm that can start on part of the group, feed it the samples as they finish
+    session = None
+    if args.group_rm and state.open_group_reward_session is not None:
+        session = state.open_group_reward_session(args, group)
+
+    async def generate_and_submit(idx: int, sample: Sample, sampling_params):
+        sample = await generate_and_rm(
+            args, sample, sampling_params, evaluation=evaluation
+        )
+        if session is not None and not state.aborted:
+            session.submit(idx, sample)
+        return sample
+
+    start_time = time.perf_counter()
     tasks = []
     for idx, sample in enumerate(group):
         current_sampling_params = sampling_params.copy()
@@ -419,17 +585,32 @@ async def generate_and_rm_group(
             current_sampling_params["sampling_seed"] = seed
         tasks.append(
             asyncio.create_task(
-                generate_and_rm(
-                    args, sample, current_sampling_params, evaluation=evaluation
-                )
+                generate_and_submit(idx, sample, current_sampling_params)
             )
         )
 
-    group = await asyncio.gather(*tasks)
+    try:
+        group = await asyncio.gather(*tasks)
+    except BaseException:
+        if session is not None:
+            session.cancel()
+        raise
+    generation_time = time.perf_counter() - start_time
 
     # for the rm that need the whole group, we will do the rm here
     if not state.aborted and args.group_rm:
-        rewards = await batched_async_rm(args, group)
+        if session is not None:
+            await session.finalize()
+        else:
+            rewards = await batched_async_rm(args, group)
+
+        completion_time = time.perf_counter() - start_time
+        metrics.observe("group_reward/completion_time", completion_time)
+        metrics.observe(
+            "group_reward/time_after_generation", completion_time - generation_time
+        )
+    elif session is not None:
+        session.cancel()
 
     return group
 
@@ -441,16 +622,7 @@ async def abort(args: Namespace, rollout_id: int) -> list[list[Sample]]:
     assert not state.aborted
     state.aborted = True
 
-    if parse(sglang_router.__version__) <= parse("0.2.1") or args.use_slime_router:
-        response = await get(
-            f"http://{args.sglang_router_ip}:{args.sglang_router_port}/list_workers"
-        )
-        urls = response["urls"]
-    else:
-        response = await get(
-            f"http://{args.sglang_router_ip}:{args.sglang_router_port}/workers"
-        )
-        urls = [worker["url"] for worker in response["workers"]]
+    urls = await get_worker_urls(args)
 
     logger.info(f"Abort request for {urls}")
     await asyncio.gather(
@@ -595,9 +767,10 @@ async def generate_rollout_async(
         process_func = load_function(args.rollout_all_samples_process_path)
         process_func(args, all_samples, data_source)
 
-    return RolloutFnTrainOutput(
-        samples=data, metrics=metric_gatherer.collect()
-    ), aborted_samples
+    rollout_metrics = metric_gatherer.collect()
+    rollout_metrics.update(metrics.collect())
+
+    return RolloutFnTrainOutput(samples=data, metrics=rollout_metrics), aborted_samples
 
 
 EVAL_PROMPT_DATASET = {}
@@ -609,11 +782,15 @@ async def eval_rollout(
     coros = []
     for dataset_cfg in getattr(args, "eval_datasets", []) or []:
         coros.append(eval_rollout_single_dataset(args, rollout_id, dataset_cfg))
-    results_list = await asyncio.gather(*coros)
+    token = evaluating.set(True)
+    try:
+        results_list = await asyncio.gather(*coros)
+    finally:
+        evaluating.reset(token)
     results = {}
     for r in results_list:
         results.update(r)
-    return RolloutFnEvalOutput(data=results), []
+    return RolloutFnEvalOutput(data=results, metrics=eval_metrics.collect()), []
 
 
 async def eval_rollout_single_dataset(
@@ -0,0 +1,94 @@
+import random
+from collections.abc import Hashable
+from contextlib import contextmanager
+
+from cachetools import LRUCache
+
+from qqr.utils.metrics import metrics
+
+
+class SessionRouter:
+    """
+    Sticky routing of multi-turn trajectories to SGLang engines and DP ranks.
+
+    Every session (a trajectory, or a whole group) is pinned to the rank that served its
+    first request, so that later turns reuse the KV cache of earlier ones. Requests spill
+    over to the least-loaded rank when the pinned rank is saturated, and the session
+    follows them to the new rank.
+    """
+
+    def __init__(self, max_inflight_per_rank: int, max_sessions: int = 65536):
+        """
+        Args:
+            max_inflight_per_rank: Number of in-flight requests from which a rank is
+                considered saturated.
+            max_sessions: Maximum number of pinned sessions, evicted in LRU order.
+        """
+        self.max_inflight_per_rank = max(max_inflight_per_rank, 1)
+        self.sessions = LRUCache(maxsize=max_sessions)
+
+        self.ranks: list[tuple[str, int]] = []
+        self.inflight: list[int] = []
+        self.stale = True
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.ranks) and not self.stale
+
+    def set_workers(self, urls: list[str], dp_size: int) -> None:
+        ranks = [(url, dp_rank) for url in sorted(urls) for dp_rank in range(dp_size)]
+        if ranks != self.ranks:
+            # The in-flight counts are swapped along with the ranks, so that requests
+            # still routed to the old ranks release their own counts.
+            self.ranks = ranks
+            self.inflight = [0] * len(ranks)
+            self.sessions.clear()
+        self.stale = False
+
+    def reset(self) -> None:
+        """Marks the workers to be refreshed, e.g. before the next rollout."""
+        self.stale = True
+
+    @contextmanager
+    def route(self, session_id: Hashable):
+        """Yields the worker url and DP rank serving the next request of the session."""
+        assert self.ready, "No workers to route to."
+
+        rank = self.sessions.get(session_id)
+        if rank is None:
+            rank = self.least_loaded()
+            metrics.inc("session_router/misses")
+        elif self.inflight[rank] >= self.max_inflight_per_rank:
+            rank = self.least_loaded()
+            metrics.inc("session_router/spillovers")
+        else:
+            metrics.inc("session_router/hits")
+            metrics.inc(f"session_router/rank_{rank}/hits")
+        self.sessions[session_id] = rank
+
+        metrics.inc("session_router/requests")
+        metrics.inc(f"session_router/rank_{rank}/requests")
+
+        inflight = self.inflight
+        inflight[rank] += 1
+        mean_inflight = sum(inflight) / len(inflight)
+        metrics.observe("session_router/imbalance", max(inflight) / mean_inflight)
+
+        url, dp_rank = self.ranks[rank]
+        try:
+            yield url, dp_rank
+        finally:
+            inflight[rank] -= 1
+            assert inflight[rank] >= 0
+
+    def least_loaded(self) -> int:
+        min_inflight = min(self.inflight)
+        candidates = [
+            i for i, count in enumerate(self.inflight) if count == min_inflight
+        ]
+        return random.choice(candidates)
+
+
+metrics.register_ratio(
+    "session_router/hit_rate", "session_router/hits", "session_router/requests"
+)
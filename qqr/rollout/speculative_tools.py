@@ -0,0 +1,92 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from qqr.data.prompts.qwen3 import Qwen3Prompt
+from qqr.utils.metrics import metrics
+
+
+class SpeculativeToolExecutor:
+    """
+    Dispatches the tool calls of a turn while the response is still being decoded.
+
+    `on_text` is fed the streamed response text, and every complete tool call block is
+    dispatched as soon as it is decoded. When the turn ends, `join` reuses the calls that
+    match the tool calls parsed from the final response and cancels the others, e.g.
+    when the response turns out to be malformed.
+    """
+
+    def __init__(
+        self,
+        call_tool: Callable[[dict], Awaitable[dict]],
+        prompter: Qwen3Prompt | None = None,
+    ):
+        self.call_tool = call_tool
+        self.prompter = prompter or Qwen3Prompt()
+
+        self.tasks: list[tuple[dict, asyncio.Task]] = []
+        self.num_blocks = 0
+        self.scanned_length = 0
+
+    def on_text(self, text: str) -> None:
+        # Only look for new blocks once a closing tag has been decoded.
+        eot_token = self.prompter.eot_token
+        new_text = text[max(self.scanned_length - len(eot_token) + 1, 0) :]
+        self.scanned_length = len(text)
+        if eot_token not in new_text:
+            return
+
+        blocks = self.prompter.find_tool_calls(text)
+        for func_idx in range(self.num_blocks, len(blocks)):
+            tool_call = self.prompter.parse_tool_call(func_idx, blocks[func_idx])
+            if tool_call is None:
+                continue
+            self.tasks.append(
+                (tool_call, asyncio.create_task(self.call_tool(tool_call)))
+            )
+            metrics.inc("speculative_tools/dispatched")
+        self.num_blocks = max(self.num_blocks, len(blocks))
+
+    async def join(self, tool_calls: list[dict]) -> list[dict]:
+        """Returns the responses to the final tool calls, in order."""
+        pending = self.tasks
+        self.tasks = []
+
+        tasks = []
+        for tool_call in tool_calls:
+            match_idx = next(
+                (i for i, (t, _) in enumerate(pending) if t == tool_call), None
+            )
+            if match_idx is None:
+                tasks.append(asyncio.create_task(self.call_tool(tool_call)))
+                metrics.inc("speculative_tools/misses")
+            else:
+                tasks.append(pending.pop(match_idx)[1])
+                metrics.inc("speculative_tools/hits")
+
+        self._cancel(pending)
+
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # Do not leave the other calls running when one fails or the turn is
+            # cancelled.
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def cancel(self) -> None:
+        """Cancels all the dispatched calls, e.g. when the turn makes no tool calls."""
+        self._cancel(self.tasks)
+        self.tasks = []
+
+    def _cancel(self, tasks: list[tuple[dict, asyncio.Task]]) -> None:
+        for _, task in tasks:
+            task.cancel()
+        metrics.inc("speculative_tools/cancelled", len(tasks))
+
+
+metrics.register_ratio(
+    "speculative_tools/hit_rate",
+    "speculative_tools/hits",
+    "speculative_tools/dispatched",
+)
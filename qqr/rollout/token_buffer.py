@@ -0,0 +1,156 @@
+import logging
+
+from qqr.schemas import Sample
+from qqr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TrajectoryTokenBuffer:
+    """
+    Append-only token buffer of a multi-turn trajectory.
+
+    Keeps the tokens of the previous turns, including the exact tokens sampled by the
+    model, so that each turn only renders and tokenizes the messages appended since the
+    last response (tool responses, trailing system messages and the generation prompt).
+
+    The messages must be append-only, i.e. earlier messages are never rewritten.
+
+    The tokens following the first prompt are tracked with their loss mask (1 for
+    sampled tokens, 0 for rendered ones) and rollout log probs, so that the whole
+    trajectory can be trained as a single sequence.
+    """
+
+    anchor_marker = "<|qqr_anchor|>"
+
+    def __init__(
+        self, tokenizer, tools: list[dict] | None = None, verify: bool = False
+    ):
+        """
+        Args:
+            tokenizer: The tokenizer whose chat template renders the messages.
+            tools: The tool schemas rendered into the first turn.
+            verify: Check every prompt against a full re-render of the messages.
+        """
+        self.tokenizer = tokenizer
+        self.tools = tools
+        self.verify = verify
+
+        self.tokens: list[int] = []
+        self.num_messages = 0
+        self.extendable = True
+
+        self.loss_mask: list[int] = []
+        self.rollout_log_probs: list[float] = []
+
+    def get_prompt_ids(self, messages: list[dict]) -> list[int]:
+        """Returns the prompt tokens of the next turn."""
+        if not self.tokens or not self.extendable:
+            prompt_text = self.tokenizer.apply_chat_template(
+                list(messages),
+                tools=self.tools,
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+            self.tokens = self.tokenizer.encode(prompt_text, add_special_tokens=False)
+            self.extendable = True
+            self.loss_mask = []
+            self.rollout_log_probs = []
+        elif len(messages) > self.num_messages:
+            suffix_text = self.render_suffix(messages[self.num_messages :])
+            suffix_ids = self.tokenizer.encode(suffix_text, add_special_tokens=False)
+            self.tokens = self.tokens + suffix_ids
+            self.loss_mask += [0] * len(suffix_ids)
+            self.rollout_log_probs += [0.0] * len(suffix_ids)
+        self.num_messages = len(messages)
+
+        if self.verify:
+            self.verify_prompt_ids(messages)
+
+        return self.tokens
+
+    @property
+    def response_length(self) -> int:
+        """Number of tokens following the first prompt."""
+        return len(self.loss_mask)
+
+    def update(self, sample: Sample, num_messages: int) -> None:
+        """
+        Appends the sampled response tokens of the finished turn.
+
+        Turns that did not end with the eos token (truncated or aborted) cannot be
+        extended, so the next turn falls back to a full render.
+        """
+        response_tokens = sample.tokens[len(self.tokens) :]
+        response_log_probs = list(sample.rollout_log_probs or [])
+        if len(response_log_probs) != len(response_tokens):
+            logger.warning(
+                f"[TrajectoryTokenBuffer] Got {len(response_log_probs)} log probs for "
+                f"{len(response_tokens)} response tokens."
+            )
+            response_log_probs = (response_log_probs + [0.0] * len(response_tokens))[
+                : len(response_tokens)
+            ]
+
+        self.tokens = self.tokens + response_tokens
+        self.loss_mask += [1] * len(response_tokens)
+        self.rollout_log_probs += response_log_probs
+        self.num_messages = num_messages
+
+        self.extendable = (
+            sample.status == Sample.Status.COMPLETED
+            and len(response_tokens) > 0
+            and response_tokens[-1] == self.tokenizer.eos_token_id
+        )
+
+    def render_suffix(self, messages: list[dict]) -> str:
+        """
+        Renders the messages following an assistant turn.
+
+        The messages are rendered behind an anchor conversation, and everything after
+        the eos token closing the anchor assistant turn is the suffix. The suffix starts
+        with the separator the template puts after the eos token (e.g. "\\n" for Qwen),
+        since sampled responses stop right at the eos token.
+        """
+        anchor = [
+            {"role": "user", "content": self.anchor_marker},
+            {"role": "assistant", "content": self.anchor_marker},
+        ]
+        text = self.tokenizer.apply_chat_template(
+            anchor + messages, tokenize=False, add_generation_prompt=True
+        )
+        # The first marker is the anchor user turn, the second one the assistant turn.
+        marker_idx = text.index(self.anchor_marker)
+        marker_idx = text.index(
+            self.anchor_marker, marker_idx + len(self.anchor_marker)
+        )
+        anchor_end = text.index(self.tokenizer.eos_token, marker_idx) + len(
+            self.tokenizer.eos_token
+        )
+
+        return text[anchor_end:]
+
+    def verify_prompt_ids(self, messages: list[dict]) -> None:
+        prompt_text = self.tokenizer.apply_chat_template(
+            list(messages), tools=self.tools, tokenize=False, add_generation_prompt=True
+        )
+        expected = self.tokenizer.encode(prompt_text, add_special_tokens=False)
+        if expected == self.tokens:
+            return
+
+        metrics.inc("token_buffer/mismatches")
+        mismatch_idx = next(
+            (
+                i
+                for i, (a, b) in enumerate(zip(self.tokens, expected, strict=False))
+                if a != b
+            ),
+            min(len(self.tokens), len(expected)),
+        )
+        logger.warning(
+            f"[TrajectoryTokenBuffer] Prompt differs from the full re-render at token "
+            f"{mismatch_idx} (buffer: {len(self.tokens)} tokens, "
+            f"re-render: {len(expected)} tokens):\n"
+            f"buffer: {self.tokenizer.decode(self.tokens[mismatch_idx:][:64])!r}\n"
+            f"re-render: {self.tokenizer.decode(expected[mismatch_idx:][:64])!r}"
+        )
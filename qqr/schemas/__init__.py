@@ -1,5 +1,14 @@
 from .llm_judge import LLMJudge
-from .reward_model import GroupRewardModel, RewardModel
+from .message_log import MessageLog, MessageView
+from .reward_model import GroupRewardModel, GroupRewardSession, RewardModel
 from .sample import Sample
 
-__all__ = ["LLMJudge", "RewardModel", "GroupRewardModel", "Sample"]
+__all__ = [
+    "LLMJudge",
+    "MessageLog",
+    "MessageView",
+    "RewardModel",
+    "GroupRewardModel",
+    "GroupRewardSession",
+    "Sample",
+]
@@ -0,0 +1,112 @@
+from collections.abc import Iterable, MutableSequence
+
+
+class MessageLog:
+    """
+    Shared append-only log of the messages of a trajectory.
+
+    Every step of a trajectory holds a `MessageView` over a prefix of the log instead of
+    a copy of the messages, so memory grows linearly with the number of steps.
+    """
+
+    def __init__(self, messages: Iterable[dict] | None = None):
+        self.messages: list[dict] = list(messages or [])
+
+    def view(self) -> "MessageView":
+        return MessageView(self, len(self.messages))
+
+
+class MessageView(MutableSequence):
+    """
+    Copy-on-write view of the first messages of a `MessageLog`.
+
+    - Appending to a view that ends at the end of the log appends to the shared log.
+    - Replacing a message is recorded as an override local to the view.
+    - Any other mutation first copies the view into a log of its own.
+
+    Views are pickled as plain lists.
+    """
+
+    __slots__ = ("_end", "_log", "_overrides")
+
+    def __init__(
+        self, log: MessageLog, end: int, overrides: dict[int, dict] | None = None
+    ):
+        self._log = log
+        self._end = end
+        self._overrides = overrides or {}
+
+    def view(self) -> "MessageView":
+        """Returns a new view of the same messages, e.g. for the next step."""
+        return MessageView(self._log, self._end, self._overrides.copy())
+
+    def __len__(self) -> int:
+        return self._end
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._end))]
+
+        idx = self._normalize_index(idx)
+        if idx in self._overrides:
+            return self._overrides[idx]
+        return self._log.messages[idx]
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            self._fork()
+            self._log.messages[idx] = value
+            self._end = len(self._log.messages)
+            return
+
+        self._overrides[self._normalize_index(idx)] = value
+
+    def __delitem__(self, idx):
+        self._fork()
+        del self._log.messages[idx]
+        self._end = len(self._log.messages)
+
+    def __iter__(self):
+        for idx in range(self._end):
+            yield self[idx]
+
+    def insert(self, idx: int, value: dict) -> None:
+        if idx >= self._end and self._at_tail():
+            self.append(value)
+            return
+
+        self._fork()
+        self._log.messages.insert(idx, value)
+        self._end = len(self._log.messages)
+
+    def append(self, value: dict) -> None:
+        if not self._at_tail():
+            self._fork()
+        self._log.messages.append(value)
+        self._end += 1
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, MessageView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def _at_tail(self) -> bool:
+        return self._end == len(self._log.messages)
+
+    def _normalize_index(self, idx: int) -> int:
+        if idx < 0:
+            idx += self._end
+        if not 0 <= idx < self._end:
+            raise IndexError("message index out of range")
+        return idx
+
+    def _fork(self) -> None:
+        self._log = MessageLog(self)
+        self._end = len(self._log.messages)
+        self._overrides = {}
@@ -1,4 +1,7 @@
+import asyncio
+import contextvars
 from abc import ABC, abstractmethod
+from collections.abc import Coroutine
 
 
 class RewardModel(ABC):
@@ -19,3 +22,62 @@ class GroupRewardModel(ABC):
     async def compute(
         self, predictions: list, reference=None, *args, **kwargs
     ) -> list[float] | list[dict[str, float]]: ...
+
+    def open_session(self, group_size: int, *args, **kwargs) -> "GroupRewardSession":
+        """Opens an incremental computation of the rewards of a group."""
+        return GroupRewardSession(self, group_size, *args, **kwargs)
+
+
+class GroupRewardSession:
+    """
+    Incremental computation of the rewards of a group.
+
+    Predictions are submitted as they complete, so that the topology can start judging
+    them before the whole group is there. The default session waits for the whole group
+    and calls `compute` of the reward model.
+
+    The tasks of the session run in the context it was opened in, whichever task
+    submits the predictions.
+    """
+
+    def __init__(
+        self, reward_model: GroupRewardModel, group_size: int, *args, **kwargs
+    ):
+        self.reward_model = reward_model
+        self.group_size = group_size
+        self.args = args
+        self.kwargs = kwargs
+
+        self.predictions: list = [None] * group_size
+        self.tasks: list[asyncio.Task] = []
+        self.context = contextvars.copy_context()
+
+    def submit(self, idx: int, prediction) -> None:
+        self.predictions[idx] = prediction
+        self.on_submit(idx)
+
+    def on_submit(self, idx: int) -> None:
+        """Called when the prediction at `idx` is submitted, e.g. to start judging it."""
+
+    def create_task(self, coro: Coroutine) -> asyncio.Task:
+        """Starts a task that is cancelled along with the session."""
+        task = asyncio.create_task(coro, context=self.context.copy())
+        self.tasks.append(task)
+        return task
+
+    async def finalize(self) -> list[float] | list[dict[str, float]]:
+        """Returns the rewards, once all the predictions have been submitted."""
+        try:
+            return await self.create_task(self.compute())
+        except BaseException:
+            self.cancel()
+            raise
+
+    async def compute(self) -> list[float] | list[dict[str, float]]:
+        return await self.reward_model.compute(
+            self.predictions, *self.args, **self.kwargs
+        )
+
+    def cancel(self) -> None:
+        for task in self.tasks:
+            task.cancel()
@@ -2,12 +2,15 @@ from dataclasses import dataclass, field
 
 from slime.utils.types import Sample as BaseSample
 
+from .message_log import MessageView
+
 
 @dataclass
 class Sample(BaseSample):
     """The sample generated"""
 
-    messages: list[dict[str, str]] = field(default_factory=list)
+    # A list, or a copy-on-write view of the message log shared by a trajectory
+    messages: list[dict[str, str]] | MessageView = field(default_factory=list)
     response_message: dict[str, str] = None
 
     def to_dict(self):
@@ -26,6 +29,7 @@ class Sample(BaseSample):
         ]
         value = self.__dict__.copy()
         value["status"] = self.status.value
+        value["messages"] = list(self.messages)
         value = {k: value[k] for k in keys if value[k] is not None}
         return value
 
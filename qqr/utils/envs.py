@@ -5,6 +5,8 @@ from ..data.text import to_bool
 DEBUG = to_bool(os.getenv("DEBUG", "False"))
 RETRY_STOP_AFTER_ATTEMPT = int(os.getenv("RETRY_STOP_AFTER_ATTEMPT", 3))
 RETRY_WAIT_FIXED = float(os.getenv("RETRY_WAIT_FIXED", 1.0))
+# Seconds without a chunk after which a streamed generation is considered stalled
+STREAM_READ_TIMEOUT = float(os.getenv("STREAM_READ_TIMEOUT", 300))
 
 
 # region: LLMs
@@ -0,0 +1,63 @@
+import math
+from collections import defaultdict
+
+
+class Metrics:
+    """
+    Process-wide metric accumulator.
+
+    Counters are summed, observations are summarized (mean and percentiles) and
+    registered ratios are derived from counters when collected, typically once per rollout.
+    """
+
+    def __init__(self):
+        self._ratios: dict[str, tuple[str, str]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self._counters: dict[str, float] = defaultdict(float)
+        self._observations: dict[str, list[float]] = defaultdict(list)
+
+    def inc(self, key: str, value: float = 1.0) -> None:
+        self._counters[key] += value
+
+    def observe(self, key: str, value: float) -> None:
+        self._observations[key].append(value)
+
+    def register_ratio(self, key: str, numerator: str, denominator: str) -> None:
+        self._ratios[key] = (numerator, denominator)
+
+    def collect(self, reset: bool = True) -> dict[str, float]:
+        result = dict(self._counters)
+
+        for key, (numerator, denominator) in self._ratios.items():
+            if self._counters.get(denominator):
+                result[key] = self._counters[numerator] / self._counters[denominator]
+
+        for key, values in self._observations.items():
+            if not values:
+                continue
+            values = sorted(values)
+            result[f"{key}/mean"] = sum(values) / len(values)
+            result[f"{key}/p50"] = percentile(values, 50)
+            result[f"{key}/p90"] = percentile(values, 90)
+            result[f"{key}/p99"] = percentile(values, 99)
+            result[f"{key}/max"] = values[-1]
+
+        if reset:
+            self.reset()
+
+        return result
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+metrics = Metrics()
+# Metrics of the evaluation rollouts, collected apart from the training ones.
+eval_metrics = Metrics()
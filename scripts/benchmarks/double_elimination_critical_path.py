@@ -0,0 +1,94 @@
+"""
+Critical path, in dependent judge rounds, of the double elimination topology when the
+losers bracket waits for the whole winners bracket (before) versus when both brackets
+overlap (after).
+
+The stub judge takes a constant time per comparison and scores at random, so the
+elapsed time divided by that latency is the number of dependent judge rounds.
+
+    python scripts/benchmarks/double_elimination_critical_path.py
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+import click
+
+from qqr.reward_models.double_elimination import (
+    DoubleEliminationGroupRewardModel,
+    Player,
+)
+from qqr.schemas import LLMJudge
+
+
+class StubLLMJudge(LLMJudge):
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def compare(
+        self, messages_a: list[dict], messages_b: list[dict], query: str
+    ) -> tuple[float, float]:
+        await asyncio.sleep(self.latency)
+        return random.uniform(0, 10), random.uniform(0, 10)
+
+    async def bidirectional_compare(
+        self, messages_a: list[dict], messages_b: list[dict], query: str, **kwargs
+    ) -> tuple[float, float, dict]:
+        await asyncio.sleep(self.latency)
+        return random.uniform(0, 20), random.uniform(0, 20), kwargs
+
+
+async def compute_sequential(
+    model: DoubleEliminationGroupRewardModel, predictions: list[list[dict]], query: str
+) -> None:
+    """The schedule before the overlap: the losers bracket starts after the winners."""
+    players = [Player(idx=i) for i in range(len(predictions))]
+    wb_champion, drops_schedule = await model.run_winners_bracket(
+        players, predictions, query=query
+    )
+    lb_champion, _ = await model.run_losers_bracket(
+        drops_schedule, predictions, query=query
+    )
+    await model.run_grand_final(wb_champion, lb_champion, predictions, query=query)
+
+
+async def measure(
+    model: DoubleEliminationGroupRewardModel, group_size: int, overlap: bool
+) -> float:
+    predictions = [
+        [{"role": "assistant", "content": str(i)}] for i in range(group_size)
+    ]
+
+    start_time = time.perf_counter()
+    if overlap:
+        # Also computes the rewards, which takes no judge round.
+        await model.compute(predictions, query="query")
+    else:
+        await compute_sequential(model, predictions, query="query")
+    return (time.perf_counter() - start_time) / model.llm_judge.latency
+
+
+@click.command()
+@click.option("--latency", default=0.02, help="Seconds per stub judge comparison")
+@click.option("--num-trials", default=20, help="Tournaments per group size")
+def main(latency: float, num_trials: int) -> int:
+    random.seed(0)
+    model = DoubleEliminationGroupRewardModel(StubLLMJudge(latency))
+
+    print("group_size  before  after")
+    for group_size in (8, 16, 24, 32, 48, 64):
+        results = []
+        for overlap in (False, True):
+            rounds = [
+                asyncio.run(measure(model, group_size, overlap))
+                for _ in range(num_trials)
+            ]
+            results.append(sum(rounds) / len(rounds))
+        print(f"{group_size:>10}  {results[0]:>6.1f}  {results[1]:>5.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # type: ignore[call-arg]
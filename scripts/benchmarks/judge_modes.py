@@ -0,0 +1,212 @@
+"""
+Judge latency and completion tokens per comparison of the verbose, compact and winner
+modes of `PairwiseLLMJudge`, and the wall time of a batch of comparisons.
+
+The comparisons go to a local stand-in of an OpenAI-compatible judge, which replies in
+the output format of the mode named by the system prompt: the analyses and
+per-dimension scores before the combined scores, only the combined scores, or only the
+winner label with its top log probs. A reply takes a time to first token, then a
+constant time per completion token, estimated from its content.
+
+    python scripts/benchmarks/judge_modes.py --num-comparisons 64
+"""
+
+import asyncio
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+from qqr.data.text import estimate_num_tokens
+from qqr.llm_judges import PairwiseLLMJudge
+from qqr.utils.metrics import metrics
+
+CJK_CHARS = "路线规划合理信息完整准确详细交通住宿景点预算时间安排清晰可行亮点不足"
+
+
+class HTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 connections would delay the concurrent requests.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def build_verbose_reply(rng: random.Random, score_a: int, score_b: int) -> str:
+    def dimensions(*names: str) -> dict:
+        return {name: rng.randint(0, 10) for name in names}
+
+    path_dims = ("breadth", "relevance", "detail", "overall_p")
+    answer_dims = ("relevance", "feasibility", "details", "clarity", "overall_a")
+    reply = {
+        "analysis": {
+            key: "".join(rng.choices(CJK_CHARS, k=rng.randint(80, 120)))
+            for key in ("path_A", "path_B", "answer_A", "answer_B")
+        },
+        "path_scores": {
+            "Agent_A": dimensions(*path_dims),
+            "Agent_B": dimensions(*path_dims),
+        },
+        "answer_scores": {
+            "Agent_A": dimensions(*answer_dims),
+            "Agent_B": dimensions(*answer_dims),
+        },
+        "combined_scores": {"Agent_A": score_a, "Agent_B": score_b},
+    }
+    return json.dumps(reply, ensure_ascii=False, indent=2)
+
+
+def build_winner_logprobs(score_a: int, score_b: int) -> dict:
+    prob_a = 0.8 if score_a > score_b else 0.1 if score_a < score_b else 0.3
+    probs = {"A": prob_a, "B": 0.9 - prob_a, "Tie": 0.1}
+    top_logprobs = [
+        {"token": token, "logprob": math.log(prob), "bytes": None}
+        for token, prob in sorted(probs.items(), key=lambda item: -item[1])
+    ]
+    return {"content": [{**top_logprobs[0], "top_logprobs": top_logprobs}]}
+
+
+class StandInJudgeServer:
+    """OpenAI-compatible chat completions endpoint replying in the judge formats."""
+
+    def __init__(self, time_to_first_token: float, time_per_token: float):
+        self.time_to_first_token = time_to_first_token
+        self.time_per_token = time_per_token
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                mode = body["messages"][0]["content"]
+                prompt = body["messages"][1]["content"]
+
+                rng = random.Random(prompt)
+                score_a, score_b = rng.randint(0, 10), rng.randint(0, 10)
+                logprobs = None
+                if mode == "verbose":
+                    content = build_verbose_reply(rng, score_a, score_b)
+                elif mode == "compact":
+                    content = json.dumps(
+                        {"combined_scores": {"Agent_A": score_a, "Agent_B": score_b}}
+                    )
+                else:
+                    logprobs = build_winner_logprobs(score_a, score_b)
+                    content = logprobs["content"][0]["token"]
+
+                num_completion_tokens = estimate_num_tokens(content)
+                time.sleep(
+                    server.time_to_first_token
+                    + server.time_per_token * num_completion_tokens
+                )
+
+                num_prompt_tokens = estimate_num_tokens(prompt)
+                data = json.dumps(
+                    {
+                        "id": "chatcmpl-stand-in",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "logprobs": logprobs,
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": num_prompt_tokens,
+                            "completion_tokens": num_completion_tokens,
+                            "total_tokens": num_prompt_tokens + num_completion_tokens,
+                        },
+                    },
+                    ensure_ascii=False,
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+
+def make_prediction(rng: random.Random) -> list[dict]:
+    return [
+        {"role": "assistant", "reasoning_content": rng.randbytes(64).hex()},
+        {"role": "assistant", "content": rng.randbytes(256).hex()},
+    ]
+
+
+async def simulate(
+    server: StandInJudgeServer, mode: str, num_comparisons: int, concurrency_limit: int
+) -> None:
+    # The stand-in reads the mode from the system prompt.
+    llm_judge = PairwiseLLMJudge(
+        system_prompt=mode,
+        model="stand-in",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        concurrency_limit=concurrency_limit,
+        max_retries=0,
+        mode=mode,
+    )
+    rng = random.Random(0)
+
+    await asyncio.gather(
+        *[
+            llm_judge.compare(make_prediction(rng), make_prediction(rng), query=str(i))
+            for i in range(num_comparisons)
+        ]
+    )
+
+
+@click.command()
+@click.option("--num-comparisons", default=64)
+@click.option("--concurrency-limit", default=8)
+@click.option("--time-to-first-token", default=0.05, help="Seconds per request")
+@click.option("--time-per-token", default=0.002, help="Seconds per completion token")
+def main(
+    num_comparisons: int,
+    concurrency_limit: int,
+    time_to_first_token: float,
+    time_per_token: float,
+) -> int:
+    server = StandInJudgeServer(time_to_first_token, time_per_token)
+    keys = ("mean", "p50", "p90")
+    print(
+        f"{'mode':>8}"
+        + "".join(f"{'latency ' + k:>14}" for k in keys)
+        + f"{'wall time':>11}{'completion tokens':>19}{'parse failures':>16}"
+    )
+    for mode in PairwiseLLMJudge.modes:
+        metrics.reset()
+        start_time = time.perf_counter()
+        asyncio.run(simulate(server, mode, num_comparisons, concurrency_limit))
+        wall_time = time.perf_counter() - start_time
+        result = metrics.collect()
+        print(
+            f"{mode:>8}"
+            + "".join(f"{result[f'llm_judge/latency/{k}']:>14.3f}" for k in keys)
+            + f"{wall_time:>11.2f}"
+            + f"{result['llm_judge/completion_tokens/mean']:>19.1f}"
+            + f"{result.get('llm_judge/parse_failures', 0):>16.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # type: ignore[call-arg]
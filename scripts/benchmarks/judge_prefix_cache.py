@@ -0,0 +1,198 @@
+"""
+Cached prompt tokens (`llm_judge/cached_token_rate`) and latency of the anchor
+comparisons, with the pivot interleaved in the judge prompts versus shown first
+(`{"shared_first": True}`).
+
+The judge requests go to a local stand-in of an endpoint with prefix caching: the
+prompt is split into blocks of characters, the longest prefix of blocks already seen is
+reported as cached, and the response takes longer the more characters are not.
+
+    python scripts/benchmarks/judge_prefix_cache.py --bidirectional-margin 4
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+from qqr.llm_judges import PairwiseLLMJudge
+from qqr.reward_models import get_reward_model
+from qqr.utils.metrics import metrics
+
+
+class HTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 connections would delay the concurrent requests.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class PrefixCachingServer:
+    """OpenAI-compatible chat completions endpoint caching the prompt prefixes."""
+
+    def __init__(self, block_size: int, base_latency: float, latency_per_char: float):
+        self.block_size = block_size
+        self.base_latency = base_latency
+        self.latency_per_char = latency_per_char
+        self.blocks: set[bytes] = set()
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                prompt = "".join(m["content"] for m in body["messages"])
+
+                num_cached = server.lookup(prompt)
+                time.sleep(
+                    server.base_latency
+                    + server.latency_per_char * (len(prompt) - num_cached)
+                )
+
+                scores = random.Random(prompt).sample(range(11), 2)
+                content = json.dumps(
+                    {"combined_scores": {"Agent_A": scores[0], "Agent_B": scores[1]}}
+                )
+                data = json.dumps(
+                    {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": len(prompt),
+                            "completion_tokens": 10,
+                            "total_tokens": len(prompt) + 10,
+                            "prompt_tokens_details": {"cached_tokens": num_cached},
+                        },
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+    def lookup(self, prompt: str) -> int:
+        """Returns the number of cached characters, and caches the whole prompt."""
+        num_cached = 0
+        prefix_hash = hashlib.sha1()
+        with self.lock:
+            for end in range(self.block_size, len(prompt) + 1, self.block_size):
+                prefix_hash.update(prompt[end - self.block_size : end].encode())
+                digest = prefix_hash.copy().digest()
+                if digest in self.blocks and num_cached == end - self.block_size:
+                    num_cached = end
+                self.blocks.add(digest)
+        return num_cached
+
+
+def make_prediction(rng: random.Random, num_steps: int, step_chars: int) -> list[dict]:
+    messages = [
+        {
+            "role": "assistant",
+            "reasoning_content": rng.randbytes(step_chars // 2).hex(),
+            "tool_calls": "",
+        }
+        for _ in range(num_steps)
+    ]
+    messages.append({"role": "assistant", "content": rng.randbytes(256).hex()})
+    return messages
+
+
+async def simulate(
+    server: PrefixCachingServer,
+    shared_first: bool,
+    bidirectional_margin: float | None,
+    num_groups: int,
+    group_size: int,
+    num_steps: int,
+    step_chars: int,
+    concurrency_limit: int,
+) -> None:
+    llm_judge = PairwiseLLMJudge(
+        system_prompt="interleaved " * 256,
+        sequential_system_prompt="sequential " * 256,
+        model="stub",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        concurrency_limit=concurrency_limit,
+        max_retries=0,
+        bidirectional_margin=bidirectional_margin,
+    )
+    reward_model = get_reward_model("anchor")(llm_judge, shared_first=shared_first)
+    rng = random.Random(0)
+
+    async def run_group(group_idx: int) -> None:
+        predictions = [
+            make_prediction(rng, num_steps, step_chars) for _ in range(group_size)
+        ]
+        start_time = time.perf_counter()
+        await reward_model.compute(predictions, query=f"query {group_idx}")
+        metrics.observe(
+            "group_reward/completion_time", time.perf_counter() - start_time
+        )
+
+    await asyncio.gather(*[run_group(i) for i in range(num_groups)])
+
+
+@click.command()
+@click.option("--bidirectional-margin", default=None, type=float)
+@click.option("--num-groups", default=8)
+@click.option("--group-size", default=8)
+@click.option("--num-steps", default=8, help="Reasoning steps per trajectory")
+@click.option("--step-chars", default=512, help="Reasoning characters per step")
+@click.option("--concurrency-limit", default=16)
+@click.option("--block-size", default=64, help="Characters per cached block")
+@click.option("--base-latency", default=0.02, help="Seconds per request")
+@click.option("--latency-per-char", default=2e-6, help="Seconds per uncached char")
+def main(block_size: int, base_latency: float, latency_per_char: float, **kwargs):
+    server = PrefixCachingServer(block_size, base_latency, latency_per_char)
+    keys = ("p50", "p90", "max")
+    print(
+        f"{'layout':>12}  {'cached':>6}  {'requests':>8}"
+        + "".join(f"{'request ' + k:>13}" for k in keys)
+        + "".join(f"{'group ' + k:>11}" for k in keys)
+    )
+    for shared_first in (False, True):
+        metrics.reset()
+        asyncio.run(simulate(server, shared_first, **kwargs))
+        result = metrics.collect()
+        print(
+            f"{'shared_first' if shared_first else 'interleaved':>12}"
+            f"  {result['llm_judge/cached_token_rate']:>6.2f}"
+            f"  {result['llm_judge/requests']:>8.0f}"
+            + "".join(f"{result[f'llm_judge/latency/{k}']:>13.3f}" for k in keys)
+            + "".join(
+                f"{result[f'group_reward/completion_time/{k}']:>11.3f}" for k in keys
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # type: ignore[call-arg]
@@ -0,0 +1,111 @@
+"""
+Per-group reward latency (`group_reward/completion_time`) of groups sharing one judge,
+with the judge requests granted in arrival order ("fifo") versus by group ("group").
+
+Groups finish generating one after the other and run a topology with a stub judge,
+whose requests go through a `JudgeScheduler` and take a constant time. Requests
+outside of any group, as of an evaluation, are sent alongside.
+
+    python scripts/benchmarks/judge_scheduler_latency.py --reward-model swiss
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+import click
+
+from qqr.llm_judges import JudgeScheduler, judge_group_scope
+from qqr.reward_models import get_reward_model
+from qqr.schemas import LLMJudge
+from qqr.utils.metrics import metrics
+
+
+class StubLLMJudge(LLMJudge):
+    def __init__(self, scheduler: JudgeScheduler, latency: float):
+        self.scheduler = scheduler
+        self.latency = latency
+
+    async def compare(
+        self, messages_a: list[dict], messages_b: list[dict], query: str
+    ) -> tuple[float, float]:
+        async with self.scheduler.acquire():
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        return random.uniform(0, 10), random.uniform(0, 10)
+
+    async def bidirectional_compare(
+        self, messages_a: list[dict], messages_b: list[dict], query: str, **kwargs
+    ) -> tuple[float, float, dict]:
+        forward, backward = await asyncio.gather(
+            self.compare(messages_a, messages_b, query=query),
+            self.compare(messages_b, messages_a, query=query),
+        )
+        return forward[0] + backward[1], forward[1] + backward[0], kwargs
+
+
+async def simulate(
+    policy: str,
+    reward_model_name: str,
+    num_groups: int,
+    group_size: int,
+    arrival_interval: float,
+    num_eval_requests: int,
+    concurrency_limit: int,
+    latency: float,
+) -> None:
+    scheduler = JudgeScheduler(concurrency_limit, policy=policy)
+    llm_judge = StubLLMJudge(scheduler, latency)
+    reward_model = get_reward_model(reward_model_name)(llm_judge)
+
+    async def run_group(group_idx: int) -> None:
+        await asyncio.sleep(group_idx * arrival_interval)
+        predictions = [
+            [{"role": "assistant", "content": f"{group_idx}-{i}"}]
+            for i in range(group_size)
+        ]
+        start_time = time.perf_counter()
+        with judge_group_scope():
+            await reward_model.compute(predictions, query=str(group_idx))
+        metrics.observe(
+            "group_reward/completion_time", time.perf_counter() - start_time
+        )
+
+    async def run_eval_request(request_idx: int) -> None:
+        await asyncio.sleep(
+            request_idx * num_groups * arrival_interval / num_eval_requests
+        )
+        start_time = time.perf_counter()
+        await llm_judge.compare([], [], query="eval")
+        metrics.observe("eval/judge_latency", time.perf_counter() - start_time)
+
+    await asyncio.gather(
+        *[run_group(i) for i in range(num_groups)],
+        *[run_eval_request(i) for i in range(num_eval_requests)],
+    )
+
+
+@click.command()
+@click.option("--reward-model", default="swiss", help="Registered topology")
+@click.option("--num-groups", default=16)
+@click.option("--group-size", default=8)
+@click.option("--arrival-interval", default=0.01, help="Seconds between groups")
+@click.option("--num-eval-requests", default=16)
+@click.option("--concurrency-limit", default=8)
+@click.option("--latency", default=0.05, help="Mean seconds per judge request")
+def main(reward_model: str, **kwargs) -> int:
+    keys = ("mean", "p50", "p90", "p99", "max")
+    print(f"{'policy':>6}  {'metric':<28}" + "".join(f"{k:>7}" for k in keys))
+    for policy in JudgeScheduler.policies:
+        random.seed(0)
+        metrics.reset()
+        asyncio.run(simulate(policy, reward_model, **kwargs))
+        result = metrics.collect()
+        for name in ("group_reward/completion_time", "eval/judge_latency"):
+            values = "".join(f"{result[f'{name}/{k}']:>7.2f}" for k in keys)
+            print(f"{policy:>6}  {name:<28}{values}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # type: ignore[call-arg]
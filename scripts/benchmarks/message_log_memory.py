@@ -0,0 +1,123 @@
+"""
+Peak RSS and time of the messages kept by a rollout of 10-step deepresearch
+trajectories, with a deepcopy of the messages per step (as before `MessageLog`) versus
+views of a message log shared by the steps.
+
+Strings are immutable and not copied by deepcopy, so the difference is the dicts and
+lists copied per step, growing quadratically with the number of steps. Each mode runs
+in its own process, since the peak RSS of a process never decreases.
+
+    python scripts/benchmarks/message_log_memory.py --num-trajectories 64
+"""
+
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from copy import deepcopy
+
+import click
+
+from qqr.schemas import MessageLog
+
+
+def build_tool_response(rng: random.Random, size: int) -> dict:
+    content = rng.randbytes(size // 2).hex()
+    return {"role": "tool", "tool_call_id": f"call_{rng.random()}", "content": content}
+
+
+def build_assistant_message(rng: random.Random, step_idx: int) -> dict:
+    return {
+        "role": "assistant",
+        "content": rng.randbytes(1000).hex(),
+        "tool_calls": [
+            {
+                "id": f"call_{step_idx}",
+                "type": "function",
+                "function": {"name": "web_search", "arguments": '{"query": "q"}'},
+            }
+        ],
+    }
+
+
+def run_trajectory(
+    rng: random.Random, mode: str, num_steps: int, tool_response_size: int
+) -> list:
+    """Returns the messages of every step, as kept by the samples of `agent_loop`."""
+    messages = [
+        {"role": "system", "content": "当前时间: 01/01/2026, 00:00"},
+        {"role": "user", "content": "query"},
+    ]
+    if mode == "view":
+        messages = MessageLog(messages).view()
+
+    steps = []
+    for step_idx in range(num_steps):
+        messages = messages.view() if mode == "view" else deepcopy(messages)
+        steps.append(messages)
+        messages.append(build_assistant_message(rng, step_idx))
+        messages.append(build_tool_response(rng, tool_response_size))
+
+    return steps
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@click.command()
+@click.option("--mode", type=click.Choice(["deepcopy", "view"]), default=None)
+@click.option("--num-trajectories", default=64, help="Trajectories of the rollout")
+@click.option("--num-steps", default=10, help="Steps of a trajectory")
+@click.option("--tool-response-size", default=20000, help="Characters of a tool output")
+def main(
+    mode: str | None, num_trajectories: int, num_steps: int, tool_response_size: int
+) -> int:
+    if mode is not None:
+        rng = random.Random(0)
+        baseline = get_peak_rss_mb()
+        start_time = time.perf_counter()
+        rollout = [
+            run_trajectory(rng, mode, num_steps, tool_response_size)
+            for _ in range(num_trajectories)
+        ]
+        elapsed = time.perf_counter() - start_time
+        peak = get_peak_rss_mb()
+        print(
+            json.dumps(
+                {"baseline": baseline, "peak": peak, "time": elapsed, "n": len(rollout)}
+            )
+        )
+        return 0
+
+    results = {}
+    for run_mode in ("deepcopy", "view"):
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                f"--mode={run_mode}",
+                f"--num-trajectories={num_trajectories}",
+                f"--num-steps={num_steps}",
+                f"--tool-response-size={tool_response_size}",
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[run_mode] = json.loads(output.splitlines()[-1])
+
+    for run_mode, result in results.items():
+        print(
+            f"{run_mode:>8}: peak RSS {result['peak']:.1f} MB "
+            f"({result['peak'] - result['baseline']:.1f} MB over baseline), "
+            f"{result['time']:.2f}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # type: ignore[call-arg]
@@ -0,0 +1,116 @@
+"""
+Wall time of the single elimination bracket when each round waits for all of its
+matches (before) versus when each match is played as soon as both of its participants
+are known (after), under a heavy-tailed judge latency.
+
+The stub judge scores at random and takes a lognormal time per comparison, whose
+median is `--latency` and whose tail grows with `--sigma`. Both brackets are seeded the
+same way, and the seeding comparisons are left out since they are the same in both.
+
+    python scripts/benchmarks/single_elimination_latency.py --sigma 1.0
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+import click
+
+from qqr.reward_models.single_elimination import (
+    Player,
+    SingleEliminationGroupRewardModel,
+)
+from qqr.schemas import LLMJudge
+from qqr.utils.metrics import percentile
+
+
+class StubLLMJudge(LLMJudge):
+    def __init__(self, latency: float, sigma: float):
+        self.latency = latency
+        self.sigma = sigma
+        self.rng = random.Random(0)
+
+    async def compare(
+        self, messages_a: list[dict], messages_b: list[dict], query: str
+    ) -> tuple[float, float]:
+        await asyncio.sleep(self.latency * self.rng.lognormvariate(0, self.sigma))
+        return self.rng.uniform(0, 10), self.rng.uniform(0, 10)
+
+    async def bidirectional_compare(
+        self, messages_a: list[dict], messages_b: list[dict], query: str, **kwargs
+    ) -> tuple[float, float, dict]:
+        await asyncio.sleep(self.latency * self.rng.lognormvariate(0, self.sigma))
+        return self.rng.uniform(0, 20), self.rng.uniform(0, 20), kwargs
+
+
+async def run_round_barrier_tournament(
+    model: SingleEliminationGroupRewardModel,
+    bracket: list[Player],
+    predictions: list[list[dict]],
+    query: str,
+) -> None:
+    """The schedule before the event-driven bracket: one round after the other."""
+    active_players = bracket[:]
+    while len(active_players) > 1:
+        pairings = list(zip(active_players[::2], active_players[1::2], strict=False))
+        next_round_players = active_players[-1:] if len(active_players) % 2 else []
+
+        results = await asyncio.gather(
+            *[
+                model.llm_judge.bidirectional_compare(
+                    predictions[p1.idx], predictions[p2.idx], query=query
+                )
+                for p1, p2 in pairings
+            ]
+        )
+        for (p1, p2), (score_1, score_2, _) in zip(pairings, results, strict=True):
+            next_round_players.append(p1 if score_1 >= score_2 else p2)
+
+        active_players = next_round_players
+
+
+async def measure(
+    model: SingleEliminationGroupRewardModel, group_size: int, event_driven: bool
+) -> float:
+    predictions = [
+        [{"role": "assistant", "content": str(i)}] for i in range(group_size)
+    ]
+    players = [Player(idx=i, points=[random.uniform(0, 20)]) for i in range(group_size)]
+    bracket = model.get_seeded_bracket(players)
+
+    start_time = time.perf_counter()
+    if event_driven:
+        await model.run_tournament(bracket, predictions, query="query")
+    else:
+        await run_round_barrier_tournament(model, bracket, predictions, query="query")
+    return time.perf_counter() - start_time
+
+
+@click.command()
+@click.option("--latency", default=0.02, help="Median seconds per stub comparison")
+@click.option("--sigma", default=1.0, help="Sigma of the lognormal latency")
+@click.option("--num-trials", default=20, help="Tournaments per group size")
+def main(latency: float, sigma: float, num_trials: int) -> int:
+    random.seed(0)
+
+    print("group_size  before mean  after mean  before p90  after p90")
+    for group_size in (8, 16, 24, 32, 48, 64):
+        results = []
+        for event_driven in (False, True):
+            model = SingleEliminationGroupRewardModel(StubLLMJudge(latency, sigma))
+            elapsed = sorted(
+                asyncio.run(measure(model, group_size, event_driven))
+                for _ in range(num_trials)
+            )
+            results.append((statistics.mean(elapsed), percentile(elapsed, 90)))
+        print(
+            f"{group_size:>10}  {results[0][0]:>11.3f}  {results[1][0]:>10.3f}"
+            f"  {results[0][1]:>10.3f}  {results[1][1]:>9.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # type: ignore[call-arg]
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+def verdict(score_a: float, score_b: float) -> str:
+    return json.dumps({"combined_scores": {"Agent_A": score_a, "Agent_B": score_b}})
+
+
+class FakeJudgeServer:
+    """
+    OpenAI-compatible chat completions endpoint on localhost.
+
+    `respond` maps the request body to the status code and, for a 200, the content of
+    the reply, after `delay` seconds. Streamed replies send the content word by word,
+    `stream_delay` seconds apart.
+    """
+
+    def __init__(
+        self,
+        respond: Callable[[dict], tuple[int, str]],
+        delay: float = 0.0,
+        stream_delay: float = 0.0,
+    ):
+        self.respond = respond
+        self.delay = delay
+        self.stream_delay = stream_delay
+        self.requests: list[dict] = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                server.requests.append(body)
+                time.sleep(server.delay)
+
+                status, content = server.respond(body)
+                if status == 200 and body.get("stream"):
+                    self.send_stream(body, content)
+                    return
+                if status == 200:
+                    payload = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": 100,
+                            "completion_tokens": 10,
+                            "total_tokens": 110,
+                        },
+                    }
+                else:
+                    payload = {"error": {"message": content, "code": status}}
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def send_stream(self, body: dict, content: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for word in content.split(" "):
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [{"index": 0, "delta": {"content": word + " "}}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(server.stream_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_judge_server() -> Iterator[Callable[..., FakeJudgeServer]]:
+    """Starts fake judge endpoints, stopped at the end of the test."""
+    servers = []
+
+    def start(respond, **kwargs) -> FakeJudgeServer:
+        servers.append(FakeJudgeServer(respond, **kwargs))
+        return servers[-1]
+
+    yield start
+
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    from qqr.utils.metrics import metrics
+
+    metrics.reset()
+    yield
@@ -0,0 +1,109 @@
+import asyncio
+
+from qqr.llm_judges import CascadeLLMJudge, PairwiseLLMJudge, count_judge_requests
+from qqr.utils.metrics import metrics
+
+from ..conftest import verdict
+
+MESSAGES_A = [
+    {"role": "user", "content": "query"},
+    {"role": "assistant", "content": "answer a"},
+]
+MESSAGES_B = [
+    {"role": "user", "content": "query"},
+    {"role": "assistant", "content": "answer b"},
+]
+
+
+def build_judge(fast_server, strong_server, **strong_kwargs) -> CascadeLLMJudge:
+    return CascadeLLMJudge(
+        fast_judge=PairwiseLLMJudge(
+            system_prompt="judge",
+            model="fast",
+            api_key="EMPTY",
+            base_url=fast_server.base_url,
+            max_retries=0,
+        ),
+        strong_judge=PairwiseLLMJudge(
+            system_prompt="judge",
+            model="strong",
+            api_key="EMPTY",
+            base_url=strong_server.base_url,
+            max_retries=0,
+            **strong_kwargs,
+        ),
+        escalation_margin=2.0,
+    )
+
+
+def test_decisive_fast_verdict_is_kept(fake_judge_server):
+    fast_server = fake_judge_server(lambda body: (200, verdict(9, 1)))
+    strong_server = fake_judge_server(lambda body: (200, verdict(1, 9)))
+    judge = build_judge(fast_server, strong_server)
+
+    scores = asyncio.run(judge.compare(MESSAGES_A, MESSAGES_B, query="query"))
+
+    assert scores == (9.0, 1.0)
+    assert len(strong_server.requests) == 0
+    assert metrics.collect()["llm_judge/cascade/escalation_rate"] == 0.0
+
+
+def test_close_fast_verdict_is_escalated(fake_judge_server):
+    fast_server = fake_judge_server(lambda body: (200, verdict(6, 5)))
+    strong_server = fake_judge_server(lambda body: (200, verdict(2, 8)))
+    judge = build_judge(fast_server, strong_server)
+
+    scores = asyncio.run(judge.compare(MESSAGES_A, MESSAGES_B, query="query"))
+
+    assert scores == (2.0, 8.0)
+    assert len(strong_server.requests) == 1
+    result = metrics.collect()
+    assert result["llm_judge/cascade/escalation_rate"] == 1.0
+    assert result["llm_judge/cascade/fast_calls"] == 1
+    assert result["llm_judge/cascade/strong_calls"] == 1
+
+
+def test_unparsable_fast_verdict_is_escalated(fake_judge_server):
+    fast_server = fake_judge_server(lambda body: (200, "Agent_A is better."))
+    strong_server = fake_judge_server(lambda body: (200, verdict(8, 3)))
+    judge = build_judge(fast_server, strong_server)
+
+    score_a, score_b, metadata = asyncio.run(
+        judge.bidirectional_compare(MESSAGES_A, MESSAGES_B, query="query", idx=1)
+    )
+
+    assert (score_a, score_b) == (11.0, 11.0)
+    assert metadata == {"idx": 1}
+    assert len(fast_server.requests) == 2
+    assert len(strong_server.requests) == 2
+    result = metrics.collect()
+    assert result["llm_judge/cascade/fast_failures"] == 2
+    assert result["llm_judge/cascade/strong_calls"] == 2
+
+
+def test_strong_calls_count_skipped_swaps(fake_judge_server):
+    fast_server = fake_judge_server(lambda body: (200, verdict(5, 5)))
+    strong_server = fake_judge_server(lambda body: (200, verdict(9, 1)))
+    judge = build_judge(fast_server, strong_server, bidirectional_margin=4.0)
+
+    score_a, score_b, _ = asyncio.run(
+        judge.bidirectional_compare(MESSAGES_A, MESSAGES_B, query="query")
+    )
+
+    # The strong verdict is decisive, so its swapped comparison is skipped.
+    assert (score_a, score_b) == (18.0, 2.0)
+    assert len(strong_server.requests) == 1
+    assert metrics.collect()["llm_judge/cascade/strong_calls"] == 1
+
+
+def test_enclosing_scope_counts_both_tiers(fake_judge_server):
+    fast_server = fake_judge_server(lambda body: (200, verdict(6, 5)))
+    strong_server = fake_judge_server(lambda body: (200, verdict(2, 8)))
+    judge = build_judge(fast_server, strong_server)
+
+    async def compare():
+        with count_judge_requests() as num_calls:
+            await judge.compare(MESSAGES_A, MESSAGES_B, query="query")
+        return num_calls[0]
+
+    assert asyncio.run(compare()) == 2
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from openai import InternalServerError, RateLimitError
+
+from qqr.llm_judges import JudgeEndpointPool
+
+from ..conftest import verdict
+
+MESSAGES = [{"role": "user", "content": "judge"}]
+
+
+async def send(pool: JudgeEndpointPool, num_requests: int, concurrency: int = 1):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request():
+        async with semaphore:
+            return await pool.create(model="judge", messages=MESSAGES)
+
+    return await asyncio.gather(*[request() for _ in range(num_requests)])
+
+
+def test_slow_replica_gets_less_traffic(fake_judge_server):
+    fast_server = fake_judge_server(lambda body: (200, verdict(6, 4)), delay=0.01)
+    slow_server = fake_judge_server(lambda body: (200, verdict(6, 4)), delay=0.2)
+    pool = JudgeEndpointPool(
+        [fast_server.base_url, slow_server.base_url], api_key="EMPTY"
+    )
+
+    asyncio.run(send(pool, num_requests=40, concurrency=4))
+
+    assert len(fast_server.requests) + len(slow_server.requests) == 40
+    assert len(fast_server.requests) > 3 * len(slow_server.requests)
+
+
+def test_failing_replica_fails_over_and_opens_circuit(fake_judge_server):
+    healthy_server = fake_judge_server(lambda body: (200, verdict(6, 4)))
+    failing_server = fake_judge_server(lambda body: (500, "down"))
+    pool = JudgeEndpointPool(
+        [failing_server.base_url, healthy_server.base_url],
+        api_key="EMPTY",
+        failure_threshold=2,
+        cooldown=60,
+    )
+
+    responses = asyncio.run(send(pool, num_requests=10))
+
+    assert all(r.choices[0].message.content == verdict(6, 4) for r in responses)
+    # Unmeasured endpoints are tried in turn, then the circuit stays open.
+    assert len(failing_server.requests) == 2
+    assert len(healthy_server.requests) == 10
+    failing_endpoint = pool.endpoints[0]
+    assert failing_endpoint.num_failures == 2
+    assert not failing_endpoint.is_available(0.0, pool.failure_threshold)
+
+
+def test_all_replicas_failing_raises(fake_judge_server):
+    servers = [fake_judge_server(lambda body: (503, "down")) for _ in range(2)]
+    pool = JudgeEndpointPool(
+        [s.base_url for s in servers], api_key="EMPTY", max_attempts=2
+    )
+
+    with pytest.raises(InternalServerError):
+        asyncio.run(send(pool, num_requests=1))
+    assert [len(s.requests) for s in servers] == [1, 1]
+
+
+def test_rate_limit_is_not_a_failure(fake_judge_server):
+    limited_server = fake_judge_server(lambda body: (429, "rate limited"))
+    other_server = fake_judge_server(lambda body: (200, verdict(6, 4)))
+    pool = JudgeEndpointPool(
+        [limited_server.base_url, other_server.base_url],
+        api_key="EMPTY",
+        failure_threshold=1,
+    )
+
+    # Raised for the scheduler to back off, without retrying or opening the circuit.
+    for _ in range(3):
+        pool.endpoints[1].num_in_flight = 1
+        with pytest.raises(RateLimitError):
+            asyncio.run(send(pool, num_requests=1))
+    pool.endpoints[1].num_in_flight = 0
+
+    assert len(limited_server.requests) == 3
+    assert len(other_server.requests) == 0
+    assert pool.endpoints[0].num_failures == 0
+
+
+def test_streamed_latency_is_measured_until_closed(fake_judge_server):
+    server = fake_judge_server(lambda body: (200, verdict(6, 4)), stream_delay=0.05)
+    pool = JudgeEndpointPool([server.base_url], api_key="EMPTY")
+    endpoint = pool.endpoints[0]
+
+    async def stream():
+        response = await pool.create(model="judge", messages=MESSAGES, stream=True)
+        assert endpoint.num_in_flight == 1
+        content = ""
+        try:
+            async for chunk in response:
+                content += chunk.choices[0].delta.content
+        finally:
+            await response.close()
+        return content
+
+    content = asyncio.run(stream())
+
+    assert content.strip() == verdict(6, 4)
+    assert endpoint.num_in_flight == 0
+    # The content has 5 words, each followed by a delay.
+    assert endpoint.latency >= 0.25
@@ -0,0 +1,119 @@
+import asyncio
+
+from qqr.llm_judges import JudgeScheduler, PairwiseLLMJudge
+from qqr.utils.metrics import metrics
+
+from ..conftest import verdict
+
+MESSAGES_A = [
+    {"role": "user", "content": "query"},
+    {"role": "assistant", "content": "answer a"},
+]
+MESSAGES_B = [
+    {"role": "user", "content": "query"},
+    {"role": "assistant", "content": "answer b"},
+]
+
+
+def test_rate_limits_reach_the_scheduler(fake_judge_server):
+    responses = iter([(429, "rate limited"), (200, verdict(7, 3))])
+    server = fake_judge_server(lambda body: next(responses))
+    scheduler = JudgeScheduler(8, tpm_limit=10**6, adaptive_concurrency=True)
+    judge = PairwiseLLMJudge(
+        system_prompt="judge",
+        model="judge",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        max_retries=3,
+        scheduler=scheduler,
+    )
+
+    scores = asyncio.run(judge.compare(MESSAGES_A, MESSAGES_B, query="query"))
+
+    assert scores == (7.0, 3.0)
+    assert judge.client.max_retries == 0
+    assert len(server.requests) == 2
+    # Halved on the rate limit, then grown by the successful retry.
+    assert scheduler.concurrency_limit == 4 + 1 / 4
+    result = metrics.collect()
+    assert result["llm_judge/scheduler/rate_limited"] == 1
+    assert result["llm_judge/scheduled_retries"] == 1
+
+
+def test_client_retries_without_rate_control(fake_judge_server):
+    server = fake_judge_server(lambda body: (200, verdict(7, 3)))
+    judge = PairwiseLLMJudge(
+        system_prompt="judge",
+        model="judge",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        max_retries=3,
+        scheduler=JudgeScheduler(8),
+    )
+
+    assert judge.client.max_retries == 3
+
+
+def build_judge(server, **kwargs) -> PairwiseLLMJudge:
+    return PairwiseLLMJudge(
+        system_prompt="interleaved",
+        model="judge",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        max_retries=0,
+        **kwargs,
+    )
+
+
+def shown_first(body: dict) -> str:
+    prompt = body["messages"][1]["content"]
+    return "b" if prompt.index("answer b") < prompt.index("answer a") else "a"
+
+
+def test_shared_comparisons_cancel_position_bias(fake_judge_server):
+    # The judge favors whichever agent is shown first.
+    server = fake_judge_server(lambda body: (200, verdict(6, 4)))
+    judge = build_judge(server, sequential_system_prompt="sequential")
+
+    score_a, score_b, metadata = asyncio.run(
+        judge.bidirectional_compare(
+            MESSAGES_A, MESSAGES_B, query="query", shared="b", idx=1
+        )
+    )
+
+    assert (score_a, score_b) == (10.0, 10.0)
+    assert metadata == {"idx": 1}
+    assert sorted(shown_first(body) for body in server.requests) == ["a", "b"]
+    for body in server.requests:
+        assert body["messages"][0]["content"] == "sequential"
+        prompt = body["messages"][1]["content"]
+        assert prompt.index("</Answer_A>") < prompt.index("<PATH_B>")
+
+
+def test_shared_trajectory_is_compared_first(fake_judge_server):
+    server = fake_judge_server(lambda body: (200, verdict(9, 1)))
+    judge = build_judge(
+        server, sequential_system_prompt="sequential", bidirectional_margin=4.0
+    )
+
+    score_a, score_b, _ = asyncio.run(
+        judge.bidirectional_compare(MESSAGES_A, MESSAGES_B, query="query", shared="b")
+    )
+
+    # Decisive, so only the comparison showing the shared trajectory first is sent.
+    assert [shown_first(body) for body in server.requests] == ["b"]
+    assert (score_a, score_b) == (2.0, 18.0)
+
+
+def test_shared_comparisons_without_sequential_prompt(fake_judge_server):
+    server = fake_judge_server(lambda body: (200, verdict(6, 4)))
+    judge = build_judge(server)
+
+    asyncio.run(
+        judge.bidirectional_compare(MESSAGES_A, MESSAGES_B, query="query", shared="b")
+    )
+
+    for body in server.requests:
+        assert body["messages"][0]["content"] == "interleaved"
+        prompt = body["messages"][1]["content"]
+        assert prompt.index("<PATH_B>") < prompt.index("<Answer_A>")
@@ -0,0 +1,33 @@
+import asyncio
+
+from qqr.llm_judges import PairwiseLLMJudge
+from qqr.reward_models import get_reward_model
+
+from ..conftest import verdict
+
+
+def test_shared_first_shows_the_pivot_first(fake_judge_server):
+    server = fake_judge_server(lambda body: (200, verdict(9, 1)))
+    llm_judge = PairwiseLLMJudge(
+        system_prompt="interleaved",
+        sequential_system_prompt="sequential",
+        model="judge",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        max_retries=0,
+        bidirectional_margin=4.0,
+    )
+    reward_model = get_reward_model("anchor")(llm_judge, shared_first=True)
+    predictions = [
+        [{"role": "user", "content": "query"}, {"role": "assistant", "content": name}]
+        for name in ("pivot", "first", "second", "third")
+    ]
+
+    rewards = asyncio.run(reward_model.compute(predictions, query="query"))
+
+    assert len(rewards) == 4
+    # Decisive, so only the comparisons showing the pivot first are sent.
+    assert len(server.requests) == 3
+    for body in server.requests:
+        assert body["messages"][0]["content"] == "sequential"
+        assert "<Answer_A>\npivot" in body["messages"][1]["content"]
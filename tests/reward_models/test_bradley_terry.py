@@ -0,0 +1,30 @@
+import pytest
+
+from qqr.reward_models.bradley_terry import BradleyTerryGroupRewardModel, is_connected
+
+
+@pytest.mark.parametrize(
+    ("group_size", "degree"),
+    [(n, k) for n in range(3, 17) for k in (2, 3, 4, 5) if k < n],
+)
+def test_comparison_graph_is_connected_and_regular(group_size, degree):
+    model = BradleyTerryGroupRewardModel(llm_judge=None, degree=degree)
+
+    pairs = model.create_comparison_graph(group_size)
+
+    assert is_connected(group_size, set(pairs))
+    # An odd degree is lowered by one in odd groups.
+    expected_degree = degree - 1 if degree % 2 and group_size % 2 else degree
+    assert len(pairs) == group_size * expected_degree // 2
+
+
+def test_degree_under_two_is_rejected():
+    with pytest.raises(ValueError):
+        BradleyTerryGroupRewardModel(llm_judge=None, degree=1)
+
+
+def test_degree_of_the_group_size_is_rejected():
+    model = BradleyTerryGroupRewardModel(llm_judge=None, degree=4)
+
+    with pytest.raises(ValueError):
+        model.create_comparison_graph(4)
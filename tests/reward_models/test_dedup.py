@@ -0,0 +1,37 @@
+import asyncio
+
+from qqr.llm_judges import PairwiseLLMJudge
+from qqr.reward_models import get_reward_model
+from qqr.utils.metrics import metrics
+
+from ..conftest import verdict
+
+
+def build_prediction(answer: str) -> list[dict]:
+    return [
+        {"role": "user", "content": "query"},
+        {"role": "assistant", "content": answer},
+    ]
+
+
+def test_saved_judge_calls_are_counted_from_the_requests(fake_judge_server):
+    server = fake_judge_server(lambda body: (200, verdict(9, 1)))
+    llm_judge = PairwiseLLMJudge(
+        system_prompt="judge",
+        model="judge",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        max_retries=0,
+        bidirectional_margin=4.0,
+    )
+    reward_model = get_reward_model("dedup")(llm_judge, reward_model="round_robin")
+    predictions = [build_prediction(answer) for answer in ("a", "a", "b", "c")]
+
+    rewards = asyncio.run(reward_model.compute(predictions, query="query"))
+
+    assert rewards[0] == rewards[1]
+    # 3 clusters compared in 3 pairs, whose decisive verdicts skip the swap.
+    assert len(server.requests) == 3
+    result = metrics.collect()
+    assert result["dedup/judge_calls/mean"] == 3
+    assert result["dedup/saved_judge_calls/mean"] == 1
@@ -0,0 +1,44 @@
+import asyncio
+import re
+
+from qqr.llm_judges import PairwiseLLMJudge
+from qqr.reward_models import get_reward_model
+
+from ..conftest import verdict
+
+
+def score_answers(body: dict) -> tuple[int, str]:
+    """Scores each agent by the number it answered."""
+    prompt = body["messages"][1]["content"]
+    score_a, score_b = (
+        int(re.search(rf"<Answer_{label}>\n(\d+)", prompt).group(1))
+        for label in ("A", "B")
+    )
+    return 200, verdict(score_a, score_b)
+
+
+def test_single_elimination_group(fake_judge_server):
+    server = fake_judge_server(score_answers)
+    llm_judge = PairwiseLLMJudge(
+        system_prompt="judge",
+        model="judge",
+        api_key="EMPTY",
+        base_url=server.base_url,
+        max_retries=0,
+    )
+    reward_model = get_reward_model("single_elimination")(llm_judge)
+    answers = [3, 7, 1, 9, 5, 2, 8, 4]
+    predictions = [
+        [
+            {"role": "user", "content": "query"},
+            {"role": "assistant", "content": str(answer)},
+        ]
+        for answer in answers
+    ]
+
+    rewards = asyncio.run(reward_model.compute(predictions, query="query"))
+
+    assert len(rewards) == len(answers)
+    assert rewards.index(max(rewards)) == answers.index(max(answers))
+    # 7 seeding comparisons against the pivot and 7 matches, both ways.
+    assert len(server.requests) == 2 * (7 + 7)